@@ -1,22 +1,67 @@
 import os
+import json
+import time
+import gzip
+import base64
+import difflib
+import hashlib
+import abc
 import asyncio
-from typing import Optional, List, Dict, Any
+import contextlib
+from typing import Optional, List, Dict, Any, Literal, Tuple
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, Request, Response, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr
 from passlib.context import CryptContext
 import jwt
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; tools are then precompressed with gzip only
+    brotli = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Outils Interactifs Platform", version="1.0.0")
+# JSON serialization backend for all API responses: "orjson" or "stdlib"
+JSON_RESPONSE_BACKEND = os.getenv("JSON_RESPONSE_BACKEND", "orjson")
+
+def json_dumps(content: Any) -> bytes:
+    """Encode already JSON-compatible content with the configured backend"""
+    if JSON_RESPONSE_BACKEND == "orjson" and orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+def get_json_response_class(backend: str):
+    if backend == "orjson":
+        if orjson is not None:
+            return ORJSONResponse
+        logger.warning("orjson is not installed, using the stdlib JSON encoder")
+    return JSONResponse
+
+JSONResponseClass = get_json_response_class(JSON_RESPONSE_BACKEND)
+
+app = FastAPI(
+    title="Outils Interactifs Platform",
+    version="1.0.0",
+    default_response_class=JSONResponseClass
+)
 
 # CORS middleware
 app.add_middleware(
@@ -25,6 +70,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Security
@@ -33,6 +79,34 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Comma-separated emails allowed to use admin-only endpoints
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+PET_STATE_WRITE_WINDOW_SECONDS = float(os.getenv("PET_STATE_WRITE_WINDOW_SECONDS", "30"))
+PET_STATE_FLUSH_BATCH_SIZE = int(os.getenv("PET_STATE_FLUSH_BATCH_SIZE", "500"))
+
+SKOOL_CATALOG_TTL_SECONDS = float(os.getenv("SKOOL_CATALOG_TTL_SECONDS", "300"))
+CATEGORY_COUNTS_TTL_SECONDS = float(os.getenv("CATEGORY_COUNTS_TTL_SECONDS", "60"))
+
+# Pet stat decay, mirroring the PIXEL-IA Buddy client loop
+PET_DECAY_TICK_SECONDS = 30
+PET_DECAY_PER_TICK = {"happiness": 2, "energy": 3, "hunger": 4}
+PET_STAT_FLOOR = 10
+
+# Default evolution table: a pet reaches each stage once modules_completed
+# hits min_modules. The live table is kept in catalog_meta and editable.
+PET_EVOLUTION_DEFAULT_STAGES = [
+    {"stage": "baby", "level": 1, "min_modules": 0},
+    {"stage": "teen", "level": 2, "min_modules": 1},
+    {"stage": "adult", "level": 4, "min_modules": 3},
+    {"stage": "master", "level": 6, "min_modules": 6},
+]
+SKOOL_REDEEM_MAX_CODES = 50
+PET_EVOLUTION_MAX_STAGES = 20
+PET_EVOLUTION_TTL_SECONDS = float(os.getenv("PET_EVOLUTION_TTL_SECONDS", "300"))
 
 # Database
 MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
@@ -45,6 +119,105 @@ tools_collection = db.tools
 pet_states_collection = db.pet_states
 skool_modules_collection = db.skool_modules
 skool_progress_collection = db.skool_progress
+catalog_meta_collection = db.catalog_meta
+tool_blobs_collection = db.tool_blobs
+tool_variants_collection = db.tool_variants
+category_counts_collection = db.category_counts
+tool_revisions_collection = db.tool_revisions
+
+# Indexes ensured at startup, per collection
+INDEXES = {
+    users_collection: [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    tools_collection: [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("category", ASCENDING)], name="user_id_category"),
+        IndexModel([("display_rank", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="display_order"),
+        IndexModel(
+            [("category", ASCENDING), ("display_rank", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)],
+            name="category_display_order"
+        ),
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+        # French stemming; text indexes (v3) also fold case and diacritics
+        IndexModel(
+            [("title", TEXT), ("description", TEXT)],
+            name="title_description_text",
+            weights={"title": 5, "description": 1},
+            default_language="french"
+        ),
+    ],
+    pet_states_collection: [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    tool_revisions_collection: [
+        IndexModel([("tool_id", ASCENDING), ("revision", DESCENDING)], name="tool_id_revision_unique", unique=True),
+    ],
+    skool_modules_collection: [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("completion_code", ASCENDING)], name="completion_code"),
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+    ],
+    skool_progress_collection: [
+        IndexModel([("user_id", ASCENDING), ("module_id", ASCENDING)], name="user_id_module_id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("completed_at", DESCENDING)], name="user_id_completed_at"),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+}
+
+# Representative filtered queries issued by the routes: (collection, filter, sort).
+# Each must be served by an index; a COLLSCAN plan aborts startup.
+INDEXED_QUERIES = [
+    (users_collection, {"email": ""}, None),
+    (users_collection, {"id": ""}, None),
+    (tools_collection, {"id": ""}, None),
+    (tools_collection, {"id": "", "user_id": ""}, None),
+    (tools_collection, {"user_id": ""}, None),
+    (tools_collection, {"category": ""}, [("display_rank", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)]),
+    (tools_collection, {"$text": {"$search": "outil"}}, None),
+    (tool_revisions_collection, {"tool_id": ""}, [("revision", DESCENDING)]),
+    (pet_states_collection, {"user_id": ""}, None),
+    (skool_modules_collection, {"id": ""}, None),
+    (skool_progress_collection, {"user_id": "", "module_id": ""}, None),
+    (skool_progress_collection, {"user_id": ""}, [("completed_at", DESCENDING)]),
+    (skool_progress_collection, {"id": ""}, None),
+]
+MONGO_INDEX_CHECK_STRICT = os.getenv("MONGO_INDEX_CHECK_STRICT", "true").lower() == "true"
+index_status: Dict[str, Any] = {"ready": False, "collections": {}}
+
+# Tool documents hold metadata only; html_content lives in tool_blobs keyed by
+# content_hash and precompressed get_tool bodies live in tool_variants
+TOOL_SUMMARY_PROJECTION = {"_id": 0}
+
+# Catalog display order: first matching title keyword wins, others go last.
+# Persisted as display_rank on every tool write; editing these rules is
+# picked up by the startup migration.
+TOOL_ORDER_RULES = [
+    ("diagnostic", 1),
+    ("smart", 2),
+    ("cerveaux", 3),
+    ("avatar", 4),
+    ("pixel", 5),
+    ("promptiq", 6),
+]
+TOOL_ORDER_DEFAULT = 7
+TOOLS_PAGE_SIZE = 100
+TOOLS_MAX_PAGE_SIZE = 500
+TOOLS_EXPORT_BATCH_SIZE = 20
+TOOLS_BULK_MAX_OPERATIONS = 100
+TOOLS_SEARCH_PAGE_SIZE = 20
+TOOLS_SEARCH_MAX_PAGE_SIZE = 100
+# Every Nth revision of a tool stores its full html_content instead of a delta
+TOOL_REVISION_SNAPSHOT_INTERVAL = 10
+# Who may frame the raw tool HTML served by /render (CSP frame-ancestors);
+# add the SPA origin when it is not served from the API's origin
+TOOL_RENDER_FRAME_ANCESTORS = os.getenv("TOOL_RENDER_FRAME_ANCESTORS", "'self'")
+TOOL_REVISION_MAX_ATTEMPTS = 5
+
+# Content-Encodings stored precompressed for each tool, in order of preference
+TOOL_ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
 
 # Pydantic models
 class UserCreate(BaseModel):
@@ -73,6 +246,24 @@ class ToolCreate(BaseModel):
     html_content: str
     preview_image: Optional[str] = None
 
+class ToolPatch(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    html_content: Optional[str] = None
+    preview_image: Optional[str] = None
+
+class ToolSummary(BaseModel):
+    id: str
+    title: str
+    description: str
+    category: str
+    preview_image: Optional[str] = None
+    content_hash: Optional[str] = None
+    user_id: str
+    created_at: datetime
+    updated_at: datetime
+
 class Tool(BaseModel):
     id: str
     title: str
@@ -80,10 +271,58 @@ class Tool(BaseModel):
     category: str
     html_content: str
     preview_image: Optional[str] = None
+    content_hash: Optional[str] = None
     user_id: str
     created_at: datetime
     updated_at: datetime
 
+class ToolBulkOperation(BaseModel):
+    op: Literal["create", "update"]
+    id: Optional[str] = None  # required for "update"
+    tool: ToolCreate
+
+class ToolBulkRequest(BaseModel):
+    operations: List[ToolBulkOperation]
+    ordered: bool = True
+
+class ToolBulkResult(BaseModel):
+    index: int
+    op: str
+    status: Literal["created", "updated", "unchanged", "error", "skipped"]
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class ToolBulkResponse(BaseModel):
+    results: List[ToolBulkResult]
+    created: int
+    updated: int
+    unchanged: int
+    errors: int
+
+class ToolRevisionSummary(BaseModel):
+    tool_id: str
+    revision: int
+    kind: str
+    title: str
+    description: str
+    category: str
+    preview_image: Optional[str] = None
+    content_hash: str
+    user_id: str
+    created_at: datetime
+
+class ToolRevision(BaseModel):
+    tool_id: str
+    revision: int
+    title: str
+    description: str
+    category: str
+    html_content: str
+    preview_image: Optional[str] = None
+    content_hash: str
+    user_id: str
+    created_at: datetime
+
 class PetStateCreate(BaseModel):
     name: str = "PIXEL-IA"
     level: int = 1
@@ -107,6 +346,7 @@ class PetState(BaseModel):
     stage: str
     modules_completed: int
     mood: str
+    last_tick_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -129,6 +369,14 @@ class SkoolModule(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class PetEvolutionStage(BaseModel):
+    stage: str
+    level: int
+    min_modules: int
+
+class PetEvolutionRules(BaseModel):
+    stages: List[PetEvolutionStage]
+
 class SkoolProgressCreate(BaseModel):
     module_id: str
     completion_code: str
@@ -144,6 +392,56 @@ class SkoolProgress(BaseModel):
     notes: Optional[str] = None
     pet_evolution_triggered: bool = False
 
+class SkoolRedeemRequest(BaseModel):
+    completion_codes: List[str]
+    notes: Optional[str] = None
+
+class SkoolRedeemResult(BaseModel):
+    completion_code: str
+    status: Literal["completed", "already_completed", "invalid", "duplicate"]
+    module_id: Optional[str] = None
+
+class SkoolRedeemResponse(BaseModel):
+    results: List[SkoolRedeemResult]
+    completed: List[SkoolProgress]
+
+class AuthCache:
+    """Bounded LRU cache of verified tokens -> user document.
+
+    Entries expire after AUTH_CACHE_TTL_SECONDS, and never later than the
+    token's own ``exp`` claim.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return user
+
+    def set(self, token: str, claims: Dict[str, Any], user: Dict[str, Any]):
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        token_exp = claims.get("exp")
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        self._entries[token] = (expires_at, user)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+auth_cache = AuthCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+
 # Helper functions
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -151,6 +449,63 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread pool so it never blocks the event loop.
+
+    At most PASSWORD_HASH_MAX_PENDING operations may be running or queued;
+    beyond that requests are rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    async def _run(self, func, *args):
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._pending -= 1
+            self._completed += 1
+            self._total_seconds += elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_ms": round(self._total_seconds / self._completed * 1000, 1) if self._completed else 0,
+            "max_ms": round(self._max_seconds * 1000, 1),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -167,8 +522,13 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    token = credentials.credentials
+    cached_user = auth_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
@@ -178,12 +538,926 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     user = await users_collection.find_one({"id": user_id})
     if user is None:
         raise credentials_exception
+    auth_cache.set(token, payload, user)
     return user
 
+async def get_current_admin(current_user = Depends(get_current_user)):
+    if current_user["email"].lower() not in ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag derived from the given version components"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+async def get_tools_catalog_version() -> int:
+    meta = await catalog_meta_collection.find_one({"_id": "tools"})
+    return meta["version"] if meta else 0
+
+async def bump_tools_catalog_version():
+    """Invalidate the catalog ETag; call after every write to tools_collection"""
+    await catalog_meta_collection.update_one({"_id": "tools"}, {"$inc": {"version": 1}}, upsert=True)
+
+def tool_etag(tool: Dict[str, Any], encoding: Optional[str] = None) -> str:
+    # Each Content-Encoding is a distinct representation and needs its own strong ETag
+    if encoding:
+        return make_etag("tool", tool["id"], _as_utc(tool["updated_at"]).isoformat(), encoding)
+    return make_etag("tool", tool["id"], _as_utc(tool["updated_at"]).isoformat())
+
+def html_content_hash(html_content: str) -> str:
+    return hashlib.sha256(html_content.encode()).hexdigest()
+
+def accepted_encodings(request: Request) -> set:
+    """Content-Encodings the client accepts with a non-zero q-value"""
+    accepted = set()
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.lower())
+    return accepted
+
+def _as_stored(value: datetime) -> datetime:
+    # What MongoDB hands back for a stored datetime: naive UTC, millisecond precision
+    value = _as_utc(value).astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+def encode_tool_variants(tool_doc: Dict[str, Any]) -> Dict[str, bytes]:
+    """Precompress the get_tool JSON body of ``tool_doc`` for every TOOL_ENCODINGS entry.
+
+    The body is rendered exactly as get_tool would render the stored document,
+    so decoded variants are byte-identical to the uncompressed response.
+    """
+    stored = {**tool_doc, "created_at": _as_stored(tool_doc["created_at"]), "updated_at": _as_stored(tool_doc["updated_at"])}
+    body = JSONResponseClass(Tool(**stored).model_dump(mode="json")).body
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+async def store_tool_variants(tool_docs: List[Dict[str, Any]]):
+    """Precompress and store the get_tool bodies of ``tool_docs`` (with html_content)"""
+    if not tool_docs:
+        return
+    # Compression runs once per write, off the event loop, never per request
+    variants = await asyncio.to_thread(lambda: [encode_tool_variants(tool_doc) for tool_doc in tool_docs])
+    await tool_variants_collection.bulk_write([
+        ReplaceOne(
+            {"_id": tool_doc["id"]},
+            {"updated_at": tool_doc["updated_at"], "variants": encoded},
+            upsert=True
+        )
+        for tool_doc, encoded in zip(tool_docs, variants)
+    ], ordered=False)
+
+async def acquire_tool_blobs(references: List[Tuple[str, str]]):
+    """Add one reference per ``(content_hash, html_content)``, storing bodies that are new"""
+    counts: Dict[str, int] = {}
+    bodies: Dict[str, str] = {}
+    for content_hash, html_content in references:
+        counts[content_hash] = counts.get(content_hash, 0) + 1
+        bodies[content_hash] = html_content
+    if not counts:
+        return
+    now = datetime.now(timezone.utc)
+    await tool_blobs_collection.bulk_write([
+        UpdateOne(
+            {"_id": content_hash},
+            {
+                "$inc": {"refcount": count},
+                "$setOnInsert": {"html_content": bodies[content_hash], "created_at": now}
+            },
+            upsert=True
+        )
+        for content_hash, count in counts.items()
+    ], ordered=False)
+
+async def release_tool_blobs(content_hashes: List[str]):
+    """Drop one reference per hash and delete the blobs left unreferenced"""
+    counts: Dict[str, int] = {}
+    for content_hash in content_hashes:
+        counts[content_hash] = counts.get(content_hash, 0) + 1
+    if not counts:
+        return
+    await tool_blobs_collection.bulk_write([
+        UpdateOne({"_id": content_hash}, {"$inc": {"refcount": -count}})
+        for content_hash, count in counts.items()
+    ], ordered=False)
+    # Guarded so a concurrent acquire that re-referenced a blob keeps it
+    await tool_blobs_collection.delete_many({"_id": {"$in": list(counts)}, "refcount": {"$lte": 0}})
+
+def make_text_delta(previous: str, current: str) -> List[list]:
+    """Line-based delta turning ``previous`` into ``current``: [[start, end, replacement], ...]"""
+    a = previous.splitlines(keepends=True)
+    b = current.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return [
+        [i1, i2, "".join(b[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+def apply_text_delta(previous: str, delta: List[list]) -> str:
+    lines = previous.splitlines(keepends=True)
+    parts = []
+    position = 0
+    for start, end, replacement in delta:
+        parts.extend(lines[position:start])
+        parts.append(replacement)
+        position = end
+    parts.extend(lines[position:])
+    return "".join(parts)
+
+def _build_revision(tool_doc: Dict[str, Any], html_content: str, editor_id: str, revision: int,
+                    previous: Optional[Dict[str, Any]], previous_html: Optional[str]) -> Dict[str, Any]:
+    doc = {
+        "tool_id": tool_doc["id"],
+        "revision": revision,
+        "title": tool_doc["title"],
+        "description": tool_doc["description"],
+        "category": tool_doc["category"],
+        "preview_image": tool_doc.get("preview_image"),
+        "content_hash": tool_doc["content_hash"],
+        "user_id": editor_id,
+        "created_at": tool_doc["updated_at"]
+    }
+    if previous and previous["content_hash"] == tool_doc["content_hash"]:
+        # Metadata-only edit: the body is unchanged
+        return {**doc, "kind": "delta", "base_hash": previous["content_hash"], "delta": []}
+    if previous_html is not None and (revision - 1) % TOOL_REVISION_SNAPSHOT_INTERVAL:
+        delta = make_text_delta(previous_html, html_content)
+        # A delta rewriting most of the body is no cheaper than a snapshot
+        if sum(len(replacement) for _, _, replacement in delta) < len(html_content) // 2:
+            return {**doc, "kind": "delta", "base_hash": previous["content_hash"], "delta": delta}
+    return {**doc, "kind": "snapshot", "html_content": html_content}
+
+async def _build_tool_revisions(entries: List[Tuple[Dict[str, Any], str]], editor_id: str) -> List[Dict[str, Any]]:
+    tool_ids = [tool_doc["id"] for tool_doc, _ in entries]
+    pipeline = [
+        {"$match": {"tool_id": {"$in": tool_ids}}},
+        {"$sort": {"tool_id": 1, "revision": -1}},
+        {"$group": {"_id": "$tool_id", "revision": {"$first": "$revision"}, "content_hash": {"$first": "$content_hash"}}}
+    ]
+    latest = {row["_id"]: row async for row in tool_revisions_collection.aggregate(pipeline)}
+    
+    base_hashes = [
+        latest[tool_doc["id"]]["content_hash"]
+        for tool_doc, _ in entries
+        if tool_doc["id"] in latest and latest[tool_doc["id"]]["content_hash"] != tool_doc["content_hash"]
+    ]
+    bases = {}
+    if base_hashes:
+        cursor = tool_blobs_collection.find({"_id": {"$in": base_hashes}}, {"html_content": 1})
+        bases = {blob["_id"]: blob["html_content"] async for blob in cursor}
+    
+    def build():
+        revisions = []
+        for tool_doc, html_content in entries:
+            previous = latest.get(tool_doc["id"])
+            revisions.append(_build_revision(
+                tool_doc,
+                html_content,
+                editor_id,
+                previous["revision"] + 1 if previous else 1,
+                previous,
+                bases.get(previous["content_hash"]) if previous else None
+            ))
+        return revisions
+    
+    # Diffing large bodies is CPU-bound: keep it off the event loop
+    return await asyncio.to_thread(build)
+
+async def record_tool_revisions(entries: List[Tuple[Dict[str, Any], str]], editor_id: str):
+    """Append a revision for each ``(tool_doc, html_content)`` just written.
+
+    Must run before the previous bodies are released, since deltas are
+    computed against the predecessor's blob. Revision numbers that a
+    concurrent edit took first are re-allocated and retried. The history is
+    best effort: a failure is logged rather than raised, so the caller's
+    remaining side effects (blobs, counters, variants, catalog version)
+    still run.
+    """
+    try:
+        for _ in range(TOOL_REVISION_MAX_ATTEMPTS):
+            if not entries:
+                return
+            revisions = await _build_tool_revisions(entries, editor_id)
+            try:
+                await tool_revisions_collection.insert_many(revisions, ordered=False)
+                return
+            except BulkWriteError as e:
+                errors = e.details["writeErrors"]
+                if any(error["code"] != 11000 for error in errors):
+                    raise
+                entries = [entries[error["index"]] for error in errors]
+        logger.warning(f"Gave up recording revisions for tools {[tool_doc['id'] for tool_doc, _ in entries]}")
+    except Exception:
+        logger.exception("Failed to record tool revisions")
+
+def build_tool_fields(tool: ToolCreate) -> Dict[str, Any]:
+    """Stored tool fields derived from a ToolCreate payload (html_content goes to tool_blobs)"""
+    return {
+        "title": tool.title,
+        "description": tool.description,
+        "category": tool.category,
+        "preview_image": tool.preview_image,
+        "display_rank": tool_display_rank(tool.title),
+        "content_hash": html_content_hash(tool.html_content)
+    }
+
+def tool_changes_filter(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Filter matching only tools where at least one of ``fields`` differs"""
+    return {"$or": [{field: {"$ne": value}} for field, value in fields.items()]}
+
+async def finish_tool_writes(writes: List[Tuple[Dict[str, Any], str, Optional[Dict[str, Any]], bool]], editor_id: str):
+    """Side effects of tool writes that went through, as ``(tool_doc, html_content, previous, acquired)``.
+
+    ``previous`` is the tool as it was just before the write (None for a
+    create), and ``acquired`` whether the caller took a tool_blobs reference
+    for ``tool_doc``'s body. Every reference, counter and cache is derived
+    from that before image, never from an earlier read.
+    """
+    if not writes:
+        return
+    updated_ids = [tool_doc["id"] for tool_doc, _, previous, _ in writes if previous is not None]
+    if updated_ids:
+        await tool_variants_collection.delete_many({"_id": {"$in": updated_ids}})
+    
+    # Revisions diff against the previous bodies: record them before release
+    await record_tool_revisions([(tool_doc, html_content) for tool_doc, html_content, _, _ in writes], editor_id)
+    
+    released = []
+    deltas: Dict[str, int] = {}
+    for tool_doc, _, previous, acquired in writes:
+        previous_hash = previous.get("content_hash") if previous else None
+        if previous_hash == tool_doc["content_hash"]:
+            # Body unchanged: drop the duplicate reference, if one was taken
+            if acquired:
+                released.append(previous_hash)
+        elif previous_hash:
+            released.append(previous_hash)
+        if previous is None or previous["category"] != tool_doc["category"]:
+            deltas[tool_doc["category"]] = deltas.get(tool_doc["category"], 0) + 1
+            if previous is not None:
+                deltas[previous["category"]] = deltas.get(previous["category"], 0) - 1
+    await release_tool_blobs(released)
+    
+    await store_tool_variants([{**tool_doc, "html_content": html_content} for tool_doc, html_content, _, _ in writes])
+    await category_counts.adjust(editor_id, deltas)
+    await bump_tools_catalog_version()
+
+def encode_tools_cursor(tool: Dict[str, Any]) -> str:
+    """Opaque keyset cursor positioned just after ``tool`` in catalog order"""
+    key = [tool["display_rank"], _as_stored(tool["created_at"]).isoformat(), tool["id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_tools_cursor(cursor: str) -> Dict[str, Any]:
+    """Keyset filter selecting the tools that sort after ``cursor``"""
+    try:
+        rank, created_at, tool_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at = datetime.fromisoformat(created_at)
+        # Only plain values may reach the query: a dict would become an operator
+        if type(rank) is not int or not isinstance(tool_id, str):
+            raise ValueError(cursor)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return {"$or": [
+        {"display_rank": {"$gt": rank}},
+        {"display_rank": rank, "created_at": {"$gt": created_at}},
+        {"display_rank": rank, "created_at": created_at, "id": {"$gt": tool_id}},
+    ]}
+
+def tool_display_rank(title: str) -> int:
+    title = title.lower()
+    for keyword, rank in TOOL_ORDER_RULES:
+        if keyword in title:
+            return rank
+    return TOOL_ORDER_DEFAULT
+
+def tool_rank_expression() -> Dict[str, Any]:
+    """Aggregation expression equivalent to tool_display_rank, for server-side migration"""
+    title = {"$toLower": "$title"}
+    return {"$switch": {
+        "branches": [
+            {"case": {"$gte": [{"$indexOfCP": [title, keyword]}, 0]}, "then": rank}
+            for keyword, rank in TOOL_ORDER_RULES
+        ],
+        "default": TOOL_ORDER_DEFAULT
+    }}
+
+# Aggregation stages joining each tool with its html_content from tool_blobs
+TOOL_BLOB_LOOKUP = [
+    {"$lookup": {
+        "from": tool_blobs_collection.name,
+        "localField": "content_hash",
+        "foreignField": "_id",
+        "as": "blob"
+    }},
+    {"$project": {"_id": 0, "blob._id": 0, "blob.refcount": 0, "blob.created_at": 0}},
+]
+
+def _attach_html(tool: Dict[str, Any]) -> Dict[str, Any]:
+    blob = tool.pop("blob")
+    tool["html_content"] = blob[0]["html_content"] if blob else ""
+    return tool
+
+async def load_tool(query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Fetch one tool with its html_content joined from tool_blobs in a single round trip"""
+    pipeline = [{"$match": query}, {"$limit": 1}, *TOOL_BLOB_LOOKUP]
+    async for tool in tools_collection.aggregate(pipeline):
+        return _attach_html(tool)
+    return None
+
+def pet_state_etag(pet_state: Dict[str, Any]) -> str:
+    # Decay changes the body without touching updated_at, so last_tick_at is part of the version
+    last_tick_at = pet_state.get("last_tick_at")
+    return make_etag(
+        "pet",
+        pet_state["id"],
+        _as_utc(pet_state["updated_at"]).isoformat(),
+        _as_utc(last_tick_at).isoformat() if last_tick_at else ""
+    )
+
+def _as_utc(value: datetime) -> datetime:
+    # Motor returns naive datetimes that are implicitly UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def pet_mood(happiness: int, energy: int) -> str:
+    if happiness > 70 and energy > 50:
+        return "happy"
+    elif happiness < 30 or energy < 30:
+        return "sad"
+    elif energy < 20:
+        return "sleepy"
+    return "neutral"
+
+def apply_pet_decay(pet_state: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Return ``pet_state`` with the stat decay elapsed since ``last_tick_at`` applied.
+
+    Stats are stored as of ``last_tick_at`` and decayed lazily on read, so
+    nothing has to be written while the pet is idle.
+    """
+    now = now or datetime.now(timezone.utc)
+    last_tick_at = _as_utc(pet_state.get("last_tick_at") or pet_state["updated_at"])
+    ticks = int((now - last_tick_at).total_seconds() // PET_DECAY_TICK_SECONDS)
+    if ticks <= 0:
+        return pet_state
+    
+    decayed = dict(pet_state)
+    for stat, amount in PET_DECAY_PER_TICK.items():
+        decayed[stat] = max(PET_STAT_FLOOR, pet_state[stat] - amount * ticks)
+    decayed["mood"] = pet_mood(decayed["happiness"], decayed["energy"])
+    decayed["last_tick_at"] = last_tick_at + timedelta(seconds=ticks * PET_DECAY_TICK_SECONDS)
+    return decayed
+
+def pet_decay_stages(now: datetime) -> List[Dict[str, Any]]:
+    """Update pipeline stages applying the same decay as ``apply_pet_decay``, server side"""
+    tick_ms = PET_DECAY_TICK_SECONDS * 1000
+    decayed = {
+        stat: {"$cond": [
+            {"$gt": ["$_ticks", 0]},
+            {"$max": [PET_STAT_FLOOR, {"$subtract": [f"${stat}", {"$multiply": [amount, "$_ticks"]}]}]},
+            f"${stat}"
+        ]}
+        for stat, amount in PET_DECAY_PER_TICK.items()
+    }
+    return [
+        {"$set": {"last_tick_at": {"$ifNull": ["$last_tick_at", "$updated_at"]}}},
+        {"$set": {"_ticks": {"$max": [0, {"$floor": {"$divide": [{"$subtract": [now, "$last_tick_at"]}, tick_ms]}}]}}},
+        {"$set": {**decayed, "last_tick_at": {"$add": ["$last_tick_at", {"$multiply": ["$_ticks", tick_ms]}]}}},
+        {"$unset": "_ticks"},
+    ]
+
+class PetStateWriteBuffer:
+    """Write-behind buffer for pet autosaves.
+
+    The first save for a user in a window is written through to MongoDB.
+    Further saves inside PET_STATE_WRITE_WINDOW_SECONDS only update the
+    in-memory copy and are flushed together with ``bulk_write``, so writes
+    scale with active users rather than with open tabs.
+    """
+
+    def __init__(self, window_seconds: float, batch_size: int):
+        self.window_seconds = window_seconds
+        self.batch_size = batch_size
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._written_at: Dict[str, float] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Serializes flushes with out-of-band pet writes, so an in-flight
+        # bulk_write can never land on top of them
+        self._lock = asyncio.Lock()
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Latest known pet document for ``user_id``, including unflushed saves"""
+        doc = self._docs.get(user_id)
+        return dict(doc) if doc is not None else None
+
+    def remember(self, user_id: str, doc: Dict[str, Any]):
+        """Record a document that was just written through to MongoDB"""
+        self._docs[user_id] = dict(doc)
+        self._written_at[user_id] = time.monotonic()
+        self._pending.pop(user_id, None)
+
+    def stage(self, user_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Buffer ``fields`` for ``user_id`` and return the merged document.
+
+        Returns None when the save must be written through instead: the
+        buffer is disabled, the pet is unknown, or the window has elapsed.
+        """
+        doc = self._docs.get(user_id)
+        if self.window_seconds <= 0 or doc is None:
+            return None
+        if time.monotonic() - self._written_at[user_id] >= self.window_seconds:
+            return None
+        doc.update(fields)
+        self._pending.setdefault(user_id, {}).update(fields)
+        return dict(doc)
+
+    def forget(self, user_id: str):
+        """Drop everything known about ``user_id`` (after an out-of-band write)"""
+        self._docs.pop(user_id, None)
+        self._written_at.pop(user_id, None)
+        self._pending.pop(user_id, None)
+
+    @contextlib.asynccontextmanager
+    async def out_of_band_write(self, user_id: str):
+        """Flush ``user_id``'s buffered saves, then hold off every flush while the caller writes the pet.
+
+        The buffered copy is dropped before the caller writes, so saves made
+        meanwhile are written through rather than buffered (and lost), and
+        again afterwards, since it no longer matches MongoDB.
+        """
+        async with self._lock:
+            fields = self._pending.pop(user_id, None)
+            self.forget(user_id)
+            if fields:
+                await pet_states_collection.update_one(self._newer_than(user_id, fields), {"$set": fields})
+            try:
+                yield
+            finally:
+                self.forget(user_id)
+
+    @staticmethod
+    def _newer_than(user_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        # Buffered saves never overwrite a pet written after them (a
+        # write-through save or a Skool completion landing first)
+        return {"user_id": user_id, "updated_at": {"$lte": fields["updated_at"]}}
+
+    async def flush(self):
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self):
+        started = time.monotonic()
+        batch, self._pending = self._pending, {}
+        if batch:
+            items = list(batch.items())
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                try:
+                    await pet_states_collection.bulk_write(
+                        [UpdateOne(self._newer_than(user_id, fields), {"$set": fields}) for user_id, fields in chunk],
+                        ordered=False
+                    )
+                except Exception as e:
+                    logger.error(f"Pet state flush failed for {len(chunk)} users: {e}")
+                    # Re-queue, letting saves staged meanwhile win; users
+                    # written through or forgotten since then are superseded
+                    for user_id, fields in chunk:
+                        if user_id not in self._docs or self._written_at[user_id] > started:
+                            continue
+                        self._pending[user_id] = {**fields, **self._pending.get(user_id, {})}
+                    continue
+                now = time.monotonic()
+                for user_id, _ in chunk:
+                    self._written_at[user_id] = now
+        
+        # Evict idle users so memory tracks active users only
+        cutoff = time.monotonic() - self.window_seconds
+        for user_id in [u for u, t in self._written_at.items() if t < cutoff and u not in self._pending]:
+            self._docs.pop(user_id, None)
+            self._written_at.pop(user_id, None)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.window_seconds)
+            await self.flush()
+
+    def start(self):
+        if self.window_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+pet_state_buffer = PetStateWriteBuffer(PET_STATE_WRITE_WINDOW_SECONDS, PET_STATE_FLUSH_BATCH_SIZE)
+
+class VersionedCache(abc.ABC):
+    """In-process cache reloaded when ``version`` is bumped or after ``ttl_seconds``.
+
+    Subclasses implement ``_load``; it runs under a lock, so concurrent
+    readers of a stale cache trigger a single reload.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_stale(self) -> bool:
+        return (
+            self._loaded_version != self.version
+            or time.monotonic() - self._loaded_at >= self.ttl_seconds
+        )
+
+    @abc.abstractmethod
+    async def _load(self):
+        """Replace the cached data with a fresh copy from MongoDB"""
+
+    async def _ensure_loaded(self):
+        if not self._is_stale():
+            return
+        async with self._lock:
+            if not self._is_stale():
+                return
+            version = self.version
+            await self._load()
+            self._loaded_version = version
+            self._loaded_at = time.monotonic()
+
+    def bump(self):
+        self.version += 1
+
+class SkoolCatalog(VersionedCache):
+    """In-process cache of the Skool module catalog.
+
+    The catalog is reloaded when ``version`` is bumped (module creation
+    through the API) or after SKOOL_CATALOG_TTL_SECONDS, which picks up
+    changes made directly in MongoDB by create_skool_modules.py.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        super().__init__(ttl_seconds)
+        self._modules: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_code: Dict[str, Dict[str, Any]] = {}
+
+    async def _load(self):
+        modules = []
+        cursor = skool_modules_collection.find({}, {"_id": 0}).sort("created_at", 1)
+        async for module in cursor:
+            modules.append(module)
+        self._modules = modules
+        self._by_id = {module["id"]: module for module in modules}
+        self._by_code = {}
+        for module in modules:
+            self._by_code.setdefault(module["completion_code"].upper(), module)
+
+    async def modules(self) -> List[Dict[str, Any]]:
+        await self._ensure_loaded()
+        return self._modules
+
+    async def get(self, module_id: str) -> Optional[Dict[str, Any]]:
+        await self._ensure_loaded()
+        return self._by_id.get(module_id)
+
+    async def find_by_code(self, completion_code: str) -> Optional[Dict[str, Any]]:
+        await self._ensure_loaded()
+        return self._by_code.get(completion_code.upper())
+
+skool_catalog = SkoolCatalog(SKOOL_CATALOG_TTL_SECONDS)
+
+def validate_evolution_stages(stages: List[Dict[str, Any]]) -> Optional[str]:
+    """Return why ``stages`` is not a usable evolution table, or None"""
+    if not isinstance(stages, list) or not stages:
+        return "At least one stage is required"
+    if len(stages) > PET_EVOLUTION_MAX_STAGES:
+        return f"At most {PET_EVOLUTION_MAX_STAGES} stages are allowed"
+    for stage in stages:
+        if not isinstance(stage, dict):
+            return "Each stage must be an object"
+        if not isinstance(stage.get("stage"), str) or not stage["stage"]:
+            return "Each stage needs a non-empty name"
+        if stage["stage"].startswith("$"):
+            return "Stage names cannot start with '$'"
+        if type(stage.get("level")) is not int or stage["level"] < 1:
+            return "Each stage needs an integer level of at least 1"
+        if type(stage.get("min_modules")) is not int or stage["min_modules"] < 0:
+            return "Each stage needs a non-negative integer min_modules"
+    if stages[0]["min_modules"] != 0:
+        return "The first stage must have min_modules 0"
+    if len({stage["stage"] for stage in stages}) != len(stages):
+        return "Stage names must be unique"
+    if any(b["min_modules"] <= a["min_modules"] for a, b in zip(stages, stages[1:])):
+        return "min_modules must be strictly increasing"
+    return None
+
+class PetEvolution(VersionedCache):
+    """Cached, compiled pet evolution table from catalog_meta.
+
+    The table is compiled once per load into the pipeline stages applied by
+    the pet update, so completions never re-read or re-evaluate the rules.
+    It is reloaded when ``version`` is bumped or after
+    PET_EVOLUTION_TTL_SECONDS, which picks up edits made directly in MongoDB
+    or by another worker.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        super().__init__(ttl_seconds)
+        self._stages: List[Dict[str, Any]] = []
+        self._update_stages: List[Dict[str, Any]] = []
+
+    async def _load(self):
+        doc = await catalog_meta_collection.find_one({"_id": "pet_evolution"})
+        stages = doc.get("stages") if doc else PET_EVOLUTION_DEFAULT_STAGES
+        error = validate_evolution_stages(stages)
+        if error:
+            logger.error(f"Ignoring invalid pet evolution rules: {error}")
+            stages = PET_EVOLUTION_DEFAULT_STAGES
+        self._stages = [
+            {"stage": stage["stage"], "level": stage["level"], "min_modules": stage["min_modules"]}
+            for stage in stages
+        ]
+        self._update_stages = self._compile(self._stages)
+
+    async def stages(self) -> List[Dict[str, Any]]:
+        await self._ensure_loaded()
+        return self._stages
+
+    @staticmethod
+    def _compile(stages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Literal arrays, so no value is ever read as a field path or operator
+        names = {"$literal": [stage["stage"] for stage in stages]}
+        levels = {"$literal": [stage["level"] for stage in stages]}
+        # Highest stage first: the first threshold reached wins
+        target_rank = {"$switch": {
+            "branches": [
+                {"case": {"$gte": ["$modules_completed", stage["min_modules"]]}, "then": rank}
+                for rank, stage in reversed(list(enumerate(stages)))
+            ],
+            "default": 0
+        }}
+        current_rank = {"$indexOfArray": [names, "$stage"]}
+        evolves = {"$gt": ["$_evolution_rank", current_rank]}
+        return [
+            {"$set": {"_evolution_rank": target_rank}},
+            {"$set": {
+                "stage": {"$cond": [evolves, {"$arrayElemAt": [names, "$_evolution_rank"]}, "$stage"]},
+                "level": {"$cond": [evolves, {"$arrayElemAt": [levels, "$_evolution_rank"]}, "$level"]}
+            }},
+            {"$unset": "_evolution_rank"},
+        ]
+
+    async def update_stages(self) -> List[Dict[str, Any]]:
+        """Pet update pipeline stages evolving the pet for its ``modules_completed``.
+
+        Pets jump straight to the highest stage reached and never go back;
+        ``level`` is only set when the stage actually changes.
+        """
+        await self._ensure_loaded()
+        return self._update_stages
+
+pet_evolution = PetEvolution(PET_EVOLUTION_TTL_SECONDS)
+
+def _category_key(category: str) -> str:
+    # Category names become field names under "counts": escape "." and "$",
+    # and map the empty name to a lone "%", which escaping never produces
+    if not category:
+        return "%"
+    return category.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def _category_name(key: str) -> str:
+    if key == "%":
+        return ""
+    return key.replace("%24", "$").replace("%2E", ".").replace("%25", "%")
+
+class CategoryCounts:
+    """Per-user tool counts by category, kept in category_counts.
+
+    Tool writes adjust the counters with ``$inc``; reads are a single point
+    read behind an in-process cache of CATEGORY_COUNTS_TTL_SECONDS.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._cache: Dict[str, tuple] = {}
+
+    async def adjust(self, user_id: str, deltas: Dict[str, int]):
+        increments = {f"counts.{_category_key(category)}": delta for category, delta in deltas.items() if delta}
+        if increments:
+            await category_counts_collection.update_one({"_id": user_id}, {"$inc": increments}, upsert=True)
+        self._cache.pop(user_id, None)
+
+    async def get(self, user_id: str) -> List[Dict[str, Any]]:
+        cached = self._cache.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+        doc = await category_counts_collection.find_one({"_id": user_id})
+        counts = (doc or {}).get("counts", {})
+        categories = sorted(
+            ({"name": _category_name(key), "count": count} for key, count in counts.items() if count > 0),
+            key=lambda category: (-category["count"], category["name"])
+        )
+        self._cache[user_id] = (time.monotonic(), categories)
+        return categories
+
+    async def rebuild(self):
+        """Recompute every user's counters from tools_collection"""
+        pipeline = [{"$group": {"_id": {"user_id": "$user_id", "category": "$category"}, "count": {"$sum": 1}}}]
+        per_user: Dict[str, Dict[str, int]] = {}
+        async for row in tools_collection.aggregate(pipeline):
+            per_user.setdefault(row["_id"]["user_id"], {})[_category_key(row["_id"]["category"])] = row["count"]
+        await category_counts_collection.delete_many({})
+        if per_user:
+            await category_counts_collection.insert_many(
+                [{"_id": user_id, "counts": counts} for user_id, counts in per_user.items()]
+            )
+        self._cache.clear()
+
+category_counts = CategoryCounts(CATEGORY_COUNTS_TTL_SECONDS)
+
+def _plan_stages(plan: Dict[str, Any]):
+    yield plan.get("stage")
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+async def find_duplicate_keys(collection, indexes: List[IndexModel], limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+    """Key values violating each unique index in ``indexes``, at most ``limit`` per index"""
+    duplicates = {}
+    for index in indexes:
+        spec = index.document
+        if not spec.get("unique"):
+            continue
+        fields = list(spec["key"])
+        pipeline = [
+            {"$group": {"_id": {field.replace(".", "_"): f"${field}" for field in fields}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$limit": limit}
+        ]
+        rows = await collection.aggregate(pipeline, allowDiskUse=True).to_list(length=limit)
+        if rows:
+            duplicates[spec["name"]] = [{**row["_id"], "count": row["count"]} for row in rows]
+    return duplicates
+
+@app.on_event("startup")
+async def ensure_indexes():
+    """Create the declared indexes and verify the hot queries use them"""
+    for collection, indexes in INDEXES.items():
+        try:
+            created = await collection.create_indexes(indexes)
+        except Exception as e:
+            index_status["collections"][collection.name] = {"error": str(e)}
+            # Data written before the unique indexes existed may hold
+            # duplicates: name them so they can be merged or removed by hand
+            duplicates = await find_duplicate_keys(collection, indexes)
+            if duplicates:
+                index_status["collections"][collection.name]["duplicates"] = duplicates
+                message = (
+                    f"Unique index build failed on {collection.name}: duplicate keys {duplicates}. "
+                    f"Remove or merge the duplicate documents, then restart."
+                )
+                logger.error(message)
+                raise RuntimeError(message) from e
+            logger.error(f"Index build failed on {collection.name}: {e}")
+            raise
+        index_status["collections"][collection.name] = {"indexes": created}
+        logger.info(f"Indexes ready on {collection.name}: {', '.join(created)}")
+    
+    collscans = []
+    for collection, query, sort in INDEXED_QUERIES:
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = set(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+        if "COLLSCAN" in stages:
+            collscans.append(f"{collection.name} {query}")
+    
+    if collscans:
+        message = f"Queries running as collection scans: {'; '.join(collscans)}"
+        index_status["collscans"] = collscans
+        if MONGO_INDEX_CHECK_STRICT:
+            logger.error(message)
+            raise RuntimeError(message)
+        logger.warning(message)
+    index_status["ready"] = True
+
+@app.on_event("startup")
+async def migrate_inline_tool_bodies():
+    """Move html_content embedded in tool documents into the tool_blobs store"""
+    migrated = 0
+    async for tool in tools_collection.find({"html_content": {"$exists": True}}, {"_id": 0, "encoded_variants": 0}):
+        content_hash = tool.get("content_hash") or html_content_hash(tool["html_content"])
+        tool["content_hash"] = content_hash
+        await acquire_tool_blobs([(content_hash, tool["html_content"])])
+        await store_tool_variants([tool])
+        await tools_collection.update_one(
+            {"id": tool["id"]},
+            {
+                "$set": {"content_hash": content_hash},
+                "$unset": {"html_content": "", "encoded_variants": ""}
+            }
+        )
+        migrated += 1
+    if migrated:
+        logger.info(f"Moved html_content of {migrated} tools into tool_blobs")
+
+@app.on_event("startup")
+async def migrate_tool_display_ranks():
+    """Persist display_rank on tools where it is missing or out of date with TOOL_ORDER_RULES"""
+    rank = tool_rank_expression()
+    result = await tools_collection.update_many(
+        {"$expr": {"$ne": [{"$ifNull": ["$display_rank", None]}, rank]}},
+        [{"$set": {"display_rank": rank}}]
+    )
+    if result.modified_count:
+        logger.info(f"Updated display_rank on {result.modified_count} tools")
+        await bump_tools_catalog_version()
+
+@app.on_event("startup")
+async def record_baseline_tool_revisions():
+    """Give every tool written before revision history a snapshot revision"""
+    marker = await catalog_meta_collection.find_one({"_id": "tool_revisions"})
+    if marker:
+        return
+    pipeline = [
+        {"$lookup": {"from": tool_revisions_collection.name, "localField": "id", "foreignField": "tool_id", "as": "revisions"}},
+        {"$match": {"revisions": {"$size": 0}}},
+        {"$project": {"revisions": 0}},
+        *TOOL_BLOB_LOOKUP
+    ]
+    recorded = 0
+    async for tool in tools_collection.aggregate(pipeline):
+        tool = _attach_html(tool)
+        await record_tool_revisions([(tool, tool["html_content"])], tool["user_id"])
+        recorded += 1
+    await catalog_meta_collection.insert_one({"_id": "tool_revisions", "built_at": datetime.now(timezone.utc)})
+    if recorded:
+        logger.info(f"Recorded baseline revisions for {recorded} tools")
+
+@app.on_event("startup")
+async def build_category_counts():
+    """Build the category counters once, for tools written before they existed"""
+    marker = await catalog_meta_collection.find_one({"_id": "category_counts"})
+    if not marker:
+        await category_counts.rebuild()
+        await catalog_meta_collection.insert_one({"_id": "category_counts", "built_at": datetime.now(timezone.utc)})
+        logger.info("Built category counters from tools")
+
+@app.on_event("startup")
+async def start_pet_state_buffer():
+    pet_state_buffer.start()
+
+@app.on_event("shutdown")
+async def flush_pet_state_buffer():
+    await pet_state_buffer.stop()
+
+@app.on_event("shutdown")
+async def shutdown_password_hasher():
+    password_hasher.shutdown()
+
 # API Routes
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now(timezone.utc)}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc),
+        "password_hashing": password_hasher.stats(),
+        "indexes": index_status
+    }
 
 @app.post("/api/auth/register", response_model=Token)
 async def register(user: UserCreate):
@@ -197,7 +1471,7 @@ async def register(user: UserCreate):
     
     # Create new user
     user_id = str(uuid.uuid4())
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     
     user_doc = {
         "id": user_id,
@@ -220,7 +1494,7 @@ async def register(user: UserCreate):
 @app.post("/api/auth/login", response_model=Token)
 async def login(user: UserLogin):
     db_user = await users_collection.find_one({"email": user.email})
-    if not db_user or not verify_password(user.password, db_user["hashed_password"]):
+    if not db_user or not await password_hasher.verify(user.password, db_user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -242,47 +1516,83 @@ async def get_current_user_info(current_user = Depends(get_current_user)):
         created_at=current_user["created_at"]
     )
 
-@app.get("/api/tools", response_model=List[Tool])
-async def get_tools(current_user = Depends(get_current_user)):
-    """Get all available tools for authenticated users"""
-    tools = []
+@app.get("/api/tools", response_model=List[ToolSummary])
+async def get_tools(
+    request: Request,
+    response: Response,
+    limit: int = Query(TOOLS_PAGE_SIZE, ge=1, le=TOOLS_MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    category: Optional[str] = None,
+    current_user = Depends(get_current_user)
+):
+    """Get a page of available tools for authenticated users (without html_content).
+
+    Tools are ordered by display rank, then creation date. When more tools
+    follow, the cursor to pass as ``after`` is returned in X-Next-Cursor.
+    """
+    etag = make_etag("tools", await get_tools_catalog_version(), limit, after, category)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     # Remove user_id filter to make tools accessible to all authenticated users
-    cursor = tools_collection.find({})
-    async for tool in cursor:
-        tools.append(Tool(
-            id=tool["id"],
-            title=tool["title"],
-            description=tool["description"],
-            category=tool["category"],
-            html_content=tool["html_content"],
-            preview_image=tool.get("preview_image"),
-            user_id=tool["user_id"],
-            created_at=tool["created_at"],
-            updated_at=tool["updated_at"]
-        ))
-    
-    # Custom sorting order
-    def get_tool_order(tool):
-        title = tool.title.lower()
-        if "diagnostic" in title:
-            return 1
-        elif "smart" in title:
-            return 2
-        elif "3 cerveaux" in title or "cerveaux" in title:
-            return 3
-        elif "avatar" in title:
-            return 4
-        elif "pixel" in title:
-            return 5
-        elif "promptiq" in title:
-            return 6
-        else:
-            return 7  # Other tools at the end
+    query = {"category": category} if category else {}
+    if after:
+        query = {"$and": [query, decode_tools_cursor(after)]}
+    
+    cursor = tools_collection.find(query, TOOL_SUMMARY_PROJECTION).sort(
+        [("display_rank", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)]
+    ).limit(limit + 1)
+    tools = await cursor.to_list(length=limit + 1)
+    if len(tools) > limit:
+        tools = tools[:limit]
+        response.headers["X-Next-Cursor"] = encode_tools_cursor(tools[-1])
+    
+    return [ToolSummary(**tool) for tool in tools]
+
+@app.get("/api/tools/search", response_model=List[ToolSummary])
+async def search_tools(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(TOOLS_SEARCH_PAGE_SIZE, ge=1, le=TOOLS_SEARCH_MAX_PAGE_SIZE),
+    category: Optional[str] = None,
+    current_user = Depends(get_current_user)
+):
+    """Search tool titles and descriptions, best matches first (without html_content)"""
+    etag = make_etag("tools-search", await get_tools_catalog_version(), q, limit, category)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    query = {"$text": {"$search": q}}
+    if category:
+        query["category"] = category
+    
+    score = {"$meta": "textScore"}
+    cursor = tools_collection.find(query, {**TOOL_SUMMARY_PROJECTION, "score": score}).sort(
+        [("score", score), ("display_rank", ASCENDING)]
+    ).limit(limit)
+    return [ToolSummary(**tool) async for tool in cursor]
+
+@app.get("/api/tools/export")
+async def export_tools(current_user = Depends(get_current_admin)):
+    """Stream the full catalog, html_content included, as NDJSON (admin only).
+
+    Tools are read from the cursor in small batches and written one line at
+    a time, so memory stays flat and the first bytes go out immediately.
+    """
+    pipeline = [{"$sort": {"display_rank": 1, "created_at": 1, "id": 1}}, *TOOL_BLOB_LOOKUP]
     
-    # Sort tools according to the custom order
-    tools.sort(key=get_tool_order)
+    async def ndjson_lines():
+        async for tool in tools_collection.aggregate(pipeline, batchSize=TOOLS_EXPORT_BATCH_SIZE):
+            yield json_dumps(Tool(**_attach_html(tool)).model_dump(mode="json")) + b"\n"
     
-    return tools
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tools.ndjson"'}
+    )
 
 @app.post("/api/tools", response_model=Tool)
 async def create_tool(tool: ToolCreate, current_user = Depends(get_current_user)):
@@ -291,111 +1601,409 @@ async def create_tool(tool: ToolCreate, current_user = Depends(get_current_user)
     
     tool_doc = {
         "id": tool_id,
-        "title": tool.title,
-        "description": tool.description,
-        "category": tool.category,
-        "html_content": tool.html_content,
-        "preview_image": tool.preview_image,
+        **build_tool_fields(tool),
         "user_id": current_user["id"],
         "created_at": now,
         "updated_at": now
     }
     
-    await tools_collection.insert_one(tool_doc)
+    await acquire_tool_blobs([(tool_doc["content_hash"], tool.html_content)])
+    await tools_collection.insert_one(dict(tool_doc))
+    await finish_tool_writes([(tool_doc, tool.html_content, None, True)], current_user["id"])
+    
+    return Tool(**tool_doc, html_content=tool.html_content)
+
+@app.post("/api/tools/bulk", response_model=ToolBulkResponse)
+async def bulk_write_tools(batch: ToolBulkRequest, current_user = Depends(get_current_user)):
+    """Apply a batch of tool creates/updates, sharing reads and side effects.
+
+    With ``ordered`` (the default) processing stops at the first failing
+    operation and the rest are reported as skipped; otherwise every valid
+    operation is attempted concurrently. Updates only apply to the caller's
+    own tools, and only if the body and category read at the start of the
+    batch are still current.
+    """
+    operations = batch.operations
+    if len(operations) > TOOLS_BULK_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {TOOLS_BULK_MAX_OPERATIONS} operations per batch"
+        )
+    
+    user_id = current_user["id"]
+    now = datetime.now(timezone.utc)
+    results = [ToolBulkResult(index=index, op=operation.op, status="skipped") for index, operation in enumerate(operations)]
+    
+    update_ids = [operation.id for operation in operations if operation.op == "update" and operation.id]
+    existing_tools = {}
+    if update_ids:
+        cursor = tools_collection.find({"id": {"$in": update_ids}, "user_id": user_id}, {"_id": 0})
+        existing_tools = {tool["id"]: tool for tool in await cursor.to_list(length=None)}
+    
+    # Validate and build the write for each operation, in order
+    planned = []  # (index, fields to $set or None for a create, new tool doc, previous tool doc or None)
+    seen_ids = set()
+    for index, operation in enumerate(operations):
+        error = None
+        if operation.op == "update":
+            existing = existing_tools.get(operation.id)
+            if not operation.id:
+                error = "id is required for update"
+            elif operation.id in seen_ids:
+                error = "Tool updated twice in one batch"
+            elif not existing:
+                error = "Tool not found"
+        if error:
+            results[index].status, results[index].id, results[index].error = "error", operation.id, error
+            if batch.ordered:
+                break
+            continue
+        
+        fields = build_tool_fields(operation.tool)
+        if operation.op == "create":
+            tool_doc = {"id": str(uuid.uuid4()), **fields, "user_id": user_id, "created_at": now, "updated_at": now}
+            planned.append((index, None, tool_doc, None))
+        else:
+            seen_ids.add(operation.id)
+            if all(existing.get(field) == value for field, value in fields.items()):
+                results[index].status, results[index].id = "unchanged", operation.id
+                continue
+            fields["updated_at"] = now
+            planned.append((index, fields, {**existing, **fields}, existing))
+    
+    # Reference new bodies before any tool points at them
+    new_references = [
+        (tool_doc["content_hash"], operations[index].tool.html_content)
+        for index, _, tool_doc, previous in planned
+        if previous is None or previous.get("content_hash") != tool_doc["content_hash"]
+    ]
+    await acquire_tool_blobs(new_references)
+    
+    async def apply(fields, tool_doc, previous) -> Optional[str]:
+        if previous is None:
+            try:
+                await tools_collection.insert_one(dict(tool_doc))
+            except DuplicateKeyError:
+                return "Duplicate tool id"
+            return None
+        # Guarded on what the side effects are derived from: a tool deleted,
+        # or given another body or category since it was read, is not touched
+        result = await tools_collection.update_one(
+            {
+                "id": tool_doc["id"],
+                "user_id": user_id,
+                "content_hash": previous.get("content_hash"),
+                "category": previous["category"]
+            },
+            {"$set": fields}
+        )
+        return None if result.matched_count else "Tool changed or deleted during the batch"
+    
+    failed = {}
+    if batch.ordered:
+        for position, (_, fields, tool_doc, previous) in enumerate(planned):
+            error = await apply(fields, tool_doc, previous)
+            if error:
+                failed[position] = error
+                break
+    else:
+        errors = await asyncio.gather(*(apply(fields, tool_doc, previous) for _, fields, tool_doc, previous in planned))
+        failed = {position: error for position, error in enumerate(errors) if error}
+    first_failure = min(failed) if failed else None
+    
+    applied = []
+    released = []
+    for position, (index, _, tool_doc, previous) in enumerate(planned):
+        content_changed = previous is None or previous.get("content_hash") != tool_doc["content_hash"]
+        result = results[index]
+        if position in failed or (batch.ordered and first_failure is not None and position > first_failure):
+            if position in failed:
+                result.status, result.error = "error", failed[position]
+            if previous is not None:
+                result.id = tool_doc["id"]
+            if content_changed:
+                released.append(tool_doc["content_hash"])
+            continue
+        result.status, result.id = ("created" if previous is None else "updated"), tool_doc["id"]
+        applied.append((tool_doc, operations[index].tool.html_content, previous, content_changed))
     
-    return Tool(**tool_doc)
+    # Bodies referenced for writes that did not go through
+    await release_tool_blobs(released)
+    await finish_tool_writes(applied, user_id)
+    
+    statuses = [result.status for result in results]
+    return ToolBulkResponse(
+        results=results,
+        created=statuses.count("created"),
+        updated=statuses.count("updated"),
+        unchanged=statuses.count("unchanged"),
+        errors=statuses.count("error")
+    )
 
 @app.get("/api/tools/{tool_id}", response_model=Tool)
-async def get_tool(tool_id: str, current_user = Depends(get_current_user)):
+async def get_tool(tool_id: str, request: Request, response: Response, current_user = Depends(get_current_user)):
     """Get a specific tool by ID - accessible to all authenticated users"""
-    tool = await tools_collection.find_one({"id": tool_id})
+    accepted = accepted_encodings(request)
+    encoding = next((encoding for encoding in TOOL_ENCODINGS if encoding in accepted), None)
+    
+    if request.headers.get("if-none-match"):
+        # Revalidate against the version fields only, without loading html_content
+        version = await tools_collection.find_one({"id": tool_id}, {"_id": 0, "id": 1, "updated_at": 1})
+        etag = tool_etag(version, encoding) if version else None
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+    
+    if encoding:
+        # Serve the stored pre-encoded body, loading only that variant
+        stored = await tool_variants_collection.find_one(
+            {"_id": tool_id},
+            {"updated_at": 1, f"variants.{encoding}": 1}
+        )
+        body = stored.get("variants", {}).get(encoding) if stored else None
+        if body is not None:
+            etag = tool_etag({"id": tool_id, "updated_at": stored["updated_at"]}, encoding)
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers={
+                    "Content-Encoding": encoding,
+                    "Vary": "Accept-Encoding",
+                    "ETag": etag,
+                    "Cache-Control": "private, no-cache"
+                }
+            )
+    
+    tool = await load_tool({"id": tool_id})
     if not tool:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tool not found"
         )
     
+    if encoding:
+        # Variants missing (e.g. a failed write): rebuild them once, never
+        # overwriting a newer set stored by a concurrent update
+        variants = await asyncio.to_thread(encode_tool_variants, tool)
+        await tool_variants_collection.update_one(
+            {"_id": tool_id},
+            {"$setOnInsert": {"updated_at": tool["updated_at"], "variants": variants}},
+            upsert=True
+        )
+    
+    set_etag(response, tool_etag(tool))
+    response.headers["Vary"] = "Accept-Encoding"
     return Tool(**tool)
 
-@app.put("/api/tools/{tool_id}", response_model=Tool)
-async def update_tool(tool_id: str, tool_update: ToolCreate, current_user = Depends(get_current_user)):
-    existing_tool = await tools_collection.find_one({
-        "id": tool_id,
-        "user_id": current_user["id"]
-    })
-    
-    if not existing_tool:
+@app.get("/api/tools/{tool_id}/render")
+async def render_tool(tool_id: str, request: Request, v: Optional[str] = None):
+    """Serve a tool's raw HTML for iframes.
+
+    The URL must carry the current content hash (``?v=``, exposed as
+    ``content_hash`` to authenticated users), which makes it a capability
+    URL that browsers and proxies can cache forever; an edit changes the URL.
+    The HTML is user-written and runs on the app's origin, so it is only
+    served as an iframe of the app, never as a top-level page.
+    """
+    if request.headers.get("sec-fetch-dest") != "iframe":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tools can only be rendered inside the app"
+        )
+    if not v or not await tools_collection.find_one({"id": tool_id, "content_hash": v}, {"_id": 1}):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tool not found"
         )
     
-    update_doc = {
-        "title": tool_update.title,
-        "description": tool_update.description,
-        "category": tool_update.category,
-        "html_content": tool_update.html_content,
-        "preview_image": tool_update.preview_image,
-        "updated_at": datetime.now(timezone.utc)
+    headers = {
+        "ETag": f'"{v}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Sec-Fetch-Dest",
+        "X-Content-Type-Options": "nosniff",
+        "Content-Security-Policy": f"frame-ancestors {TOOL_RENDER_FRAME_ANCESTORS}"
     }
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    await tools_collection.update_one(
-        {"id": tool_id, "user_id": current_user["id"]},
-        {"$set": update_doc}
+    blob = await tool_blobs_collection.find_one({"_id": v}, {"html_content": 1})
+    if not blob:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tool not found"
+        )
+    return Response(content=blob["html_content"], media_type="text/html; charset=utf-8", headers=headers)
+
+@app.get("/api/tools/{tool_id}/revisions", response_model=List[ToolRevisionSummary])
+async def get_tool_revisions(tool_id: str, current_user = Depends(get_current_user)):
+    """List a tool's revisions, newest first (without bodies)"""
+    cursor = tool_revisions_collection.find(
+        {"tool_id": tool_id},
+        {"_id": 0, "html_content": 0, "delta": 0, "base_hash": 0}
+    ).sort("revision", DESCENDING)
+    return [ToolRevisionSummary(**revision) async for revision in cursor]
+
+@app.get("/api/tools/{tool_id}/revisions/{revision}", response_model=ToolRevision)
+async def get_tool_revision(tool_id: str, revision: int, current_user = Depends(get_current_user)):
+    """Materialize a revision: its nearest snapshot plus the deltas after it"""
+    snapshot = await tool_revisions_collection.find_one(
+        {"tool_id": tool_id, "revision": {"$lte": revision}, "kind": "snapshot"},
+        {"_id": 0},
+        sort=[("revision", DESCENDING)]
     )
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
     
-    updated_tool = await tools_collection.find_one({
-        "id": tool_id,
-        "user_id": current_user["id"]
-    })
+    target = snapshot
+    html_content = snapshot["html_content"]
+    cursor = tool_revisions_collection.find(
+        {"tool_id": tool_id, "revision": {"$gt": snapshot["revision"], "$lte": revision}},
+        {"_id": 0}
+    ).sort("revision", ASCENDING)
+    async for delta_revision in cursor:
+        html_content = apply_text_delta(html_content, delta_revision["delta"])
+        target = delta_revision
     
-    return Tool(**updated_tool)
+    if target["revision"] != revision:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
+    return ToolRevision(**{**target, "html_content": html_content})
+
+@app.put("/api/tools/{tool_id}", response_model=Tool)
+async def update_tool(tool_id: str, tool_update: ToolCreate, current_user = Depends(get_current_user)):
+    update_doc = build_tool_fields(tool_update)
+    # Reference the new body before the tool can point at it
+    await acquire_tool_blobs([(update_doc["content_hash"], tool_update.html_content)])
+    
+    # Matches only the caller's tool, and only when something changes; the
+    # before image is what references and counters are released from
+    changes = tool_changes_filter(update_doc)
+    update_doc["updated_at"] = datetime.now(timezone.utc)
+    previous = await tools_collection.find_one_and_update(
+        {"id": tool_id, "user_id": current_user["id"], **changes},
+        {"$set": update_doc},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    
+    if not previous:
+        await release_tool_blobs([update_doc["content_hash"]])
+        # Either an unchanged tool or a tool the caller does not own
+        existing_tool = await tools_collection.find_one({
+            "id": tool_id,
+            "user_id": current_user["id"]
+        }, {"_id": 0})
+        if not existing_tool:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tool not found"
+            )
+        return Tool(**existing_tool, html_content=tool_update.html_content)
+    
+    updated_tool = {**previous, **update_doc}
+    await finish_tool_writes([(updated_tool, tool_update.html_content, previous, True)], current_user["id"])
+    
+    return Tool(**updated_tool, html_content=tool_update.html_content)
+
+@app.patch("/api/tools/{tool_id}", response_model=Tool)
+async def patch_tool(tool_id: str, tool_patch: ToolPatch, current_user = Depends(get_current_user)):
+    """Update only the fields present in the request body"""
+    patch = tool_patch.model_dump(exclude_unset=True)
+    for field in ("title", "description", "category", "html_content"):
+        if field in patch and patch[field] is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{field} cannot be null"
+            )
+    
+    if not patch:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    
+    html_content = patch.pop("html_content", None)
+    update_doc = dict(patch)
+    if "title" in patch:
+        update_doc["display_rank"] = tool_display_rank(patch["title"])
+    if html_content is not None:
+        update_doc["content_hash"] = html_content_hash(html_content)
+        # Reference the new body before the tool can point at it
+        await acquire_tool_blobs([(update_doc["content_hash"], html_content)])
+    
+    # Matches only the caller's tool, and only when the patch changes something
+    changes = tool_changes_filter(update_doc)
+    update_doc["updated_at"] = datetime.now(timezone.utc)
+    previous = await tools_collection.find_one_and_update(
+        {"id": tool_id, "user_id": current_user["id"], **changes},
+        {"$set": update_doc},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    
+    if not previous:
+        if html_content is not None:
+            await release_tool_blobs([update_doc["content_hash"]])
+        # Either a no-op patch or a tool the caller does not own
+        existing_tool = await load_tool({"id": tool_id, "user_id": current_user["id"]})
+        if not existing_tool:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tool not found"
+            )
+        return Tool(**existing_tool)
+    
+    updated_tool = {**previous, **update_doc}
+    if html_content is None:
+        blob = await tool_blobs_collection.find_one({"_id": previous.get("content_hash")}, {"html_content": 1})
+        html_content = blob["html_content"] if blob else ""
+    await finish_tool_writes([(updated_tool, html_content, previous, "content_hash" in update_doc)], current_user["id"])
+    
+    return Tool(**updated_tool, html_content=html_content)
 
 @app.delete("/api/tools/{tool_id}")
 async def delete_tool(tool_id: str, current_user = Depends(get_current_user)):
-    result = await tools_collection.delete_one({
-        "id": tool_id,
-        "user_id": current_user["id"]
-    })
+    deleted_tool = await tools_collection.find_one_and_delete(
+        {"id": tool_id, "user_id": current_user["id"]},
+        projection={"_id": 0, "content_hash": 1, "category": 1}
+    )
     
-    if result.deleted_count == 0:
+    if not deleted_tool:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tool not found"
         )
+    if deleted_tool.get("content_hash"):
+        await release_tool_blobs([deleted_tool["content_hash"]])
+    await tool_variants_collection.delete_one({"_id": tool_id})
+    await tool_revisions_collection.delete_many({"tool_id": tool_id})
+    await category_counts.adjust(current_user["id"], {deleted_tool["category"]: -1})
+    await bump_tools_catalog_version()
     
     return {"message": "Tool deleted successfully"}
 
 @app.get("/api/categories")
 async def get_categories(current_user = Depends(get_current_user)):
-    pipeline = [
-        {"$match": {"user_id": current_user["id"]}},
-        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    
-    categories = []
-    async for category in tools_collection.aggregate(pipeline):
-        categories.append({
-            "name": category["_id"],
-            "count": category["count"]
-        })
-    
-    return categories
+    """Tool counts per category for the current user's tools"""
+    return await category_counts.get(current_user["id"])
 
 @app.get("/api/pet-state", response_model=PetState)
-async def get_pet_state(current_user = Depends(get_current_user)):
+async def get_pet_state(request: Request, response: Response, current_user = Depends(get_current_user)):
     """Get the user's pet state, create default if none exists"""
-    pet_state = await pet_states_collection.find_one({"user_id": current_user["id"]})
+    pet_state = pet_state_buffer.get(current_user["id"])
+    if pet_state is None:
+        pet_state = await pet_states_collection.find_one({"user_id": current_user["id"]}, {"_id": 0})
     
     if not pet_state:
-        # Create default pet state for new user
-        pet_id = str(uuid.uuid4())
+        # Create default pet state for new user; like save_pet_state, the
+        # upsert on the unique user_id lets concurrent first loads converge
         now = datetime.now(timezone.utc)
-        
         default_pet = {
-            "id": pet_id,
-            "user_id": current_user["id"],
+            "id": str(uuid.uuid4()),
             "name": "PIXEL-IA",
             "level": 1,
             "happiness": 80,
@@ -405,75 +2013,91 @@ async def get_pet_state(current_user = Depends(get_current_user)):
             "stage": "baby",
             "modules_completed": 0,
             "mood": "happy",
+            "last_tick_at": now,
             "created_at": now,
             "updated_at": now
         }
         
-        await pet_states_collection.insert_one(default_pet)
-        return PetState(**default_pet)
+        pet_state = await pet_states_collection.find_one_and_update(
+            {"user_id": current_user["id"]},
+            {"$setOnInsert": default_pet},
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
     
+    pet_state = apply_pet_decay(pet_state)
+    etag = pet_state_etag(pet_state)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return PetState(**pet_state)
 
 @app.post("/api/pet-state", response_model=PetState)
 async def save_pet_state(pet_data: PetStateCreate, current_user = Depends(get_current_user)):
-    """Save or update the user's pet state"""
+    """Save or update the user's pet state in a single atomic upsert"""
     now = datetime.now(timezone.utc)
-    existing_pet = await pet_states_collection.find_one({"user_id": current_user["id"]})
-    
-    if existing_pet:
-        # Update existing pet state
-        update_doc = {
-            "name": pet_data.name,
-            "level": pet_data.level,
-            "happiness": pet_data.happiness,
-            "knowledge": pet_data.knowledge,
-            "energy": pet_data.energy,
-            "hunger": pet_data.hunger,
-            "stage": pet_data.stage,
-            "modules_completed": pet_data.modules_completed,
-            "mood": pet_data.mood,
-            "updated_at": now
-        }
-        
-        await pet_states_collection.update_one(
-            {"user_id": current_user["id"]},
-            {"$set": update_doc}
-        )
-        
-        updated_pet = await pet_states_collection.find_one({"user_id": current_user["id"]})
-        return PetState(**updated_pet)
-    else:
-        # Create new pet state
-        pet_id = str(uuid.uuid4())
-        
-        pet_doc = {
-            "id": pet_id,
-            "user_id": current_user["id"],
-            "name": pet_data.name,
-            "level": pet_data.level,
-            "happiness": pet_data.happiness,
-            "knowledge": pet_data.knowledge,
-            "energy": pet_data.energy,
-            "hunger": pet_data.hunger,
-            "stage": pet_data.stage,
-            "modules_completed": pet_data.modules_completed,
-            "mood": pet_data.mood,
-            "created_at": now,
-            "updated_at": now
-        }
-        
-        await pet_states_collection.insert_one(pet_doc)
-        return PetState(**pet_doc)
+    update_doc = {
+        "name": pet_data.name,
+        "level": pet_data.level,
+        "happiness": pet_data.happiness,
+        "knowledge": pet_data.knowledge,
+        "energy": pet_data.energy,
+        "hunger": pet_data.hunger,
+        "stage": pet_data.stage,
+        "modules_completed": pet_data.modules_completed,
+        "mood": pet_data.mood,
+        "last_tick_at": now,
+        "updated_at": now
+    }
+    
+    buffered = pet_state_buffer.stage(current_user["id"], update_doc)
+    if buffered is not None:
+        return PetState(**buffered)
+    
+    # The unique index on user_id makes concurrent first saves converge on one document
+    pet_state = await pet_states_collection.find_one_and_update(
+        {"user_id": current_user["id"]},
+        {
+            "$set": update_doc,
+            "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}
+        },
+        projection={"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    pet_state_buffer.remember(current_user["id"], pet_state)
+    return PetState(**pet_state)
 
 # Skool Integration Endpoints
+@app.get("/api/pet-evolution/rules", response_model=PetEvolutionRules)
+async def get_pet_evolution_rules(current_user = Depends(get_current_user)):
+    """Get the PIXEL-IA evolution stages, in order"""
+    return PetEvolutionRules(stages=await pet_evolution.stages())
+
+@app.put("/api/pet-evolution/rules", response_model=PetEvolutionRules)
+async def update_pet_evolution_rules(rules: PetEvolutionRules, current_user = Depends(get_current_admin)):
+    """Replace the PIXEL-IA evolution stages (admin only); applies to the next completion"""
+    stages = [stage.model_dump() for stage in rules.stages]
+    error = validate_evolution_stages(stages)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    await catalog_meta_collection.update_one(
+        {"_id": "pet_evolution"},
+        {"$set": {"stages": stages, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    pet_evolution.bump()
+    return PetEvolutionRules(stages=stages)
+
 @app.get("/api/skool/modules", response_model=List[SkoolModule])
 async def get_skool_modules(current_user = Depends(get_current_user)):
     """Get all available Skool modules"""
-    modules = []
-    cursor = skool_modules_collection.find({}, {"_id": 0}).sort("created_at", 1)
-    async for module in cursor:
-        modules.append(SkoolModule(**module))
-    return modules
+    return [SkoolModule(**module) for module in await skool_catalog.modules()]
 
 @app.post("/api/skool/modules", response_model=SkoolModule)
 async def create_skool_module(module: SkoolModuleCreate, current_user = Depends(get_current_user)):
@@ -494,6 +2118,7 @@ async def create_skool_module(module: SkoolModuleCreate, current_user = Depends(
     }
     
     await skool_modules_collection.insert_one(module_doc)
+    skool_catalog.bump()
     return SkoolModule(**module_doc)
 
 @app.get("/api/skool/progress", response_model=List[SkoolProgress])
@@ -505,29 +2130,42 @@ async def get_user_skool_progress(current_user = Depends(get_current_user)):
         progress.append(SkoolProgress(**prog))
     return progress
 
+async def evolve_pet(user_id: str, modules: List[Dict[str, Any]], now: datetime) -> bool:
+    """Reward the pet for completing ``modules`` in one atomic update; False if the user has no pet"""
+    evolution = await pet_evolution.update_stages()
+    
+    # Persist any buffered autosave first so the update builds on it, and
+    # keep periodic flushes from overwriting the update
+    async with pet_state_buffer.out_of_band_write(user_id):
+        # Decay, rewards and evolution are applied in a single atomic update
+        result = await pet_states_collection.update_one(
+            {"user_id": user_id},
+            [
+                *pet_decay_stages(now),
+                {"$set": {
+                    "modules_completed": {"$add": ["$modules_completed", len(modules)]},
+                    "knowledge": {"$min": [{"$add": ["$knowledge", sum(module["reward_points"] for module in modules)]}, 100]},
+                    "happiness": {"$min": [{"$add": ["$happiness", 10 * len(modules)]}, 100]},
+                    "mood": {"$literal": "excited"},  # Pet is excited about learning!
+                    "updated_at": now
+                }},
+                *evolution,
+            ]
+        )
+    return bool(result.matched_count)
+
 @app.post("/api/skool/progress", response_model=SkoolProgress)
 async def complete_skool_module(progress_data: SkoolProgressCreate, current_user = Depends(get_current_user)):
     """Mark a Skool module as completed and trigger PIXEL-IA evolution"""
     
     # Check if module exists
-    module = await skool_modules_collection.find_one({"id": progress_data.module_id}, {"_id": 0})
+    module = await skool_catalog.get(progress_data.module_id)
     if not module:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Module not found"
         )
     
-    # Check if user already completed this module
-    existing_progress = await skool_progress_collection.find_one({
-        "user_id": current_user["id"],
-        "module_id": progress_data.module_id
-    })
-    if existing_progress:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Module already completed"
-        )
-    
     # Verify completion code
     if progress_data.completion_code.upper() != module["completion_code"].upper():
         raise HTTPException(
@@ -535,91 +2173,135 @@ async def complete_skool_module(progress_data: SkoolProgressCreate, current_user
             detail="Invalid completion code"
         )
     
-    # Create progress record
-    progress_id = str(uuid.uuid4())
+    # Create progress record; the unique (user_id, module_id) index rejects
+    # a second completion, even from concurrent submissions
     now = datetime.now(timezone.utc)
-    
     progress_doc = {
-        "id": progress_id,
+        "id": str(uuid.uuid4()),
         "user_id": current_user["id"],
         "module_id": progress_data.module_id,
         "module_title": module["title"],
         "completion_code": progress_data.completion_code,
         "completed_at": now,
         "notes": progress_data.notes,
-        "pet_evolution_triggered": False
+        "pet_evolution_triggered": module["required_for_evolution"]
     }
     
-    await skool_progress_collection.insert_one(progress_doc)
+    try:
+        await skool_progress_collection.insert_one(progress_doc)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Module already completed"
+        )
     
     # Trigger PIXEL-IA evolution if required
     if module["required_for_evolution"]:
-        # Get current pet state
-        pet_state = await pet_states_collection.find_one({"user_id": current_user["id"]}, {"_id": 0})
-        
-        if pet_state:
-            # Calculate new stats based on module completion
-            new_level = pet_state["level"]
-            new_stage = pet_state["stage"]
-            new_modules_completed = pet_state["modules_completed"] + 1
-            new_knowledge = min(pet_state["knowledge"] + module["reward_points"], 100)
-            new_happiness = min(pet_state["happiness"] + 10, 100)
-            
-            # Evolution logic based on modules completed
-            if new_modules_completed >= 1 and pet_state["stage"] == "baby":
-                new_stage = "teen"
-                new_level = 2
-            elif new_modules_completed >= 3 and pet_state["stage"] == "teen":
-                new_stage = "adult"
-                new_level = 4
-            elif new_modules_completed >= 6 and pet_state["stage"] == "adult":
-                new_stage = "master"
-                new_level = 6
-            
-            # Update pet state
-            update_doc = {
-                "level": new_level,
-                "happiness": new_happiness,
-                "knowledge": new_knowledge,
-                "stage": new_stage,
-                "modules_completed": new_modules_completed,
-                "mood": "excited",  # Pet is excited about learning!
-                "updated_at": now
-            }
-            
-            await pet_states_collection.update_one(
-                {"user_id": current_user["id"]},
-                {"$set": update_doc}
-            )
-            
-            # Mark evolution as triggered
+        if not await evolve_pet(current_user["id"], [module], now):
+            # No pet to evolve yet
+            progress_doc["pet_evolution_triggered"] = False
             await skool_progress_collection.update_one(
-                {"id": progress_id},
-                {"$set": {"pet_evolution_triggered": True}}
+                {"id": progress_doc["id"]},
+                {"$set": {"pet_evolution_triggered": False}}
             )
     
     return SkoolProgress(**progress_doc)
 
+@app.post("/api/skool/progress/batch", response_model=SkoolRedeemResponse)
+async def redeem_skool_codes(redeem: SkoolRedeemRequest, current_user = Depends(get_current_user)):
+    """Redeem several completion codes at once, evolving PIXEL-IA once for all of them"""
+    if not 1 <= len(redeem.completion_codes) <= SKOOL_REDEEM_MAX_CODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Between 1 and {SKOOL_REDEEM_MAX_CODES} completion codes per batch"
+        )
+    
+    user_id = current_user["id"]
+    now = datetime.now(timezone.utc)
+    
+    results = []
+    progress_docs = []
+    modules = []
+    seen_modules = set()
+    for completion_code in redeem.completion_codes:
+        module = await skool_catalog.find_by_code(completion_code)
+        if not module:
+            results.append(SkoolRedeemResult(completion_code=completion_code, status="invalid"))
+            continue
+        result = SkoolRedeemResult(completion_code=completion_code, status="completed", module_id=module["id"])
+        results.append(result)
+        if module["id"] in seen_modules:
+            result.status = "duplicate"
+            continue
+        seen_modules.add(module["id"])
+        modules.append((result, module))
+        progress_docs.append({
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "module_id": module["id"],
+            "module_title": module["title"],
+            "completion_code": completion_code,
+            "completed_at": now,
+            "notes": redeem.notes,
+            "pet_evolution_triggered": module["required_for_evolution"]
+        })
+    
+    # Modules completed earlier are rejected by the unique (user_id, module_id) index
+    already_completed = set()
+    if progress_docs:
+        try:
+            await skool_progress_collection.insert_many(progress_docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details["writeErrors"]:
+                if error["code"] != 11000:
+                    raise
+                already_completed.add(error["index"])
+    
+    completed = []
+    evolving = []
+    for index, (result, module) in enumerate(modules):
+        if index in already_completed:
+            result.status = "already_completed"
+            continue
+        completed.append(progress_docs[index])
+        if module["required_for_evolution"]:
+            evolving.append(module)
+    
+    if evolving and not await evolve_pet(user_id, evolving, now):
+        # No pet to evolve yet
+        untriggered = [doc["id"] for doc in completed if doc["pet_evolution_triggered"]]
+        for doc in completed:
+            doc["pet_evolution_triggered"] = False
+        await skool_progress_collection.update_many(
+            {"id": {"$in": untriggered}},
+            {"$set": {"pet_evolution_triggered": False}}
+        )
+    
+    return SkoolRedeemResponse(
+        results=results,
+        completed=[SkoolProgress(**doc) for doc in completed]
+    )
+
 @app.get("/api/skool/dashboard")
 async def get_skool_dashboard(current_user = Depends(get_current_user)):
     """Get Skool dashboard data including progress summary and available modules"""
+    user_id = current_user["id"]
     
-    # Get user's completed modules
-    completed_modules = []
-    cursor = skool_progress_collection.find({"user_id": current_user["id"]}, {"_id": 0})
-    completed_module_ids = []
-    async for prog in cursor:
-        completed_modules.append(prog)
-        completed_module_ids.append(prog["module_id"])
+    async def load_progress():
+        cursor = skool_progress_collection.find({"user_id": user_id}, {"_id": 0})
+        return await cursor.to_list(length=None)
     
-    # Get available modules
-    all_modules = []
-    cursor = skool_modules_collection.find({}, {"_id": 0}).sort("created_at", 1)
-    async for module in cursor:
-        all_modules.append(module)
+    async def load_pet_state():
+        pet_state = pet_state_buffer.get(user_id)
+        if pet_state is None:
+            pet_state = await pet_states_collection.find_one({"user_id": user_id}, {"_id": 0})
+        return apply_pet_decay(pet_state) if pet_state else pet_state
     
-    # Get current pet state
-    pet_state = await pet_states_collection.find_one({"user_id": current_user["id"]}, {"_id": 0})
+    # Progress, catalog and pet state are independent: fetch them concurrently
+    completed_modules, all_modules, pet_state = await asyncio.gather(
+        load_progress(), skool_catalog.modules(), load_pet_state()
+    )
+    completed_module_ids = {prog["module_id"] for prog in completed_modules}
     
     # Calculate progress statistics
     total_modules = len(all_modules)
@@ -0,0 +1,214 @@
+"""
+Benchmark the JSON response backends used by backend/server.py.
+
+Runs representative requests against the real routes (tool catalog page, a
+single tool with its full html_content, the Skool dashboard) through
+FastAPI's TestClient, once with JSON_RESPONSE_BACKEND=stdlib and once with
+orjson, and reports end-to-end throughput for each. Routing, validation,
+response_model serialization and rendering are all included; MongoDB is
+replaced by in-memory collections returning fixed documents and
+authentication is overridden, so the numbers isolate the application side.
+
+Usage:
+    python benchmark_json_responses.py [--iterations 500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+BACKENDS = ["stdlib", "orjson"]
+
+def load_sample_html():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pixel_buddy_with_backend.html")
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+class StaticCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(doc) for doc in self.docs]
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return dict(next(self._iter))
+        except StopIteration:
+            raise StopAsyncIteration
+
+class StaticCollection:
+    """Stands in for a Motor collection, answering every read with the same documents"""
+
+    def __init__(self, name, docs=(), aggregated=()):
+        self.name = name
+        self.docs = list(docs)
+        self.aggregated = list(aggregated)
+
+    def find(self, *args, **kwargs):
+        return StaticCursor(self.docs)
+
+    async def find_one(self, *args, **kwargs):
+        return dict(self.docs[0]) if self.docs else None
+
+    def aggregate(self, *args, **kwargs):
+        return StaticCursor(self.aggregated)
+
+def install_fixtures(server):
+    """Point the server's collections at fixed documents and bypass authentication"""
+    now = datetime.now(timezone.utc)
+    html = load_sample_html()
+    user = {"id": str(uuid.uuid4()), "email": "bench@example.com", "name": "Bench", "created_at": now}
+
+    tools = [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Outil {i}",
+            "description": "Un outil interactif pour apprendre l'IA générative",
+            "category": "IA",
+            "preview_image": None,
+            "display_rank": 7,
+            "content_hash": "0" * 64,
+            "user_id": user["id"],
+            "created_at": now,
+            "updated_at": now
+        }
+        for i in range(server.TOOLS_PAGE_SIZE)
+    ]
+    modules = [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Module {i}",
+            "description": "Description du module",
+            "skool_module_id": f"module-{i}",
+            "completion_code": f"CODE{i}",
+            "reward_points": 30,
+            "required_for_evolution": True,
+            "created_at": now,
+            "updated_at": now
+        }
+        for i in range(20)
+    ]
+    progress = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user["id"],
+            "module_id": module["id"],
+            "module_title": module["title"],
+            "completion_code": module["completion_code"],
+            "completed_at": now,
+            "notes": None,
+            "pet_evolution_triggered": True
+        }
+        for module in modules[::2]
+    ]
+    pet_state = {
+        "id": str(uuid.uuid4()),
+        "user_id": user["id"],
+        "name": "PIXEL-IA",
+        "level": 2,
+        "happiness": 80,
+        "knowledge": 60,
+        "energy": 75,
+        "hunger": 70,
+        "stage": "teen",
+        "modules_completed": len(progress),
+        "mood": "happy",
+        "last_tick_at": now,
+        "created_at": now,
+        "updated_at": now
+    }
+
+    server.tools_collection = StaticCollection(
+        "tools",
+        docs=tools,
+        aggregated=[{**tools[0], "blob": [{"html_content": html}]}]
+    )
+    server.catalog_meta_collection = StaticCollection("catalog_meta", docs=[{"_id": "tools", "version": 1}])
+    server.skool_modules_collection = StaticCollection("skool_modules", docs=modules)
+    server.skool_progress_collection = StaticCollection("skool_progress", docs=progress)
+    server.pet_states_collection = StaticCollection("pet_states", docs=[pet_state])
+    server.app.dependency_overrides[server.get_current_user] = lambda: user
+
+    return {
+        "GET /api/tools": f"/api/tools?limit={server.TOOLS_PAGE_SIZE}",
+        "GET /api/tools/{tool_id}": f"/api/tools/{tools[0]['id']}",
+        "GET /api/skool/dashboard": "/api/skool/dashboard",
+    }
+
+def run_worker(iterations):
+    """Measure every endpoint with the backend chosen by JSON_RESPONSE_BACKEND; print JSON"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+    import logging
+    logging.disable(logging.INFO)
+
+    from fastapi.testclient import TestClient
+    import server
+
+    endpoints = install_fixtures(server)
+    # Without a ``with`` block TestClient skips the startup hooks (no MongoDB needed)
+    client = TestClient(server.app)
+    # identity: measure JSON rendering, not the precompressed tool variants
+    headers = {"Accept-Encoding": "identity"}
+
+    results = {"response_class": server.JSONResponseClass.__name__, "endpoints": {}}
+    for endpoint, url in endpoints.items():
+        response = client.get(url, headers=headers)
+        response.raise_for_status()
+        for _ in range(min(50, iterations)):
+            client.get(url, headers=headers)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            client.get(url, headers=headers)
+        elapsed = time.perf_counter() - started
+        results["endpoints"][endpoint] = {"size": len(response.content), "rps": iterations / elapsed}
+    print(json.dumps(results))
+
+def measure_backend(backend, iterations):
+    env = {**os.environ, "JSON_RESPONSE_BACKEND": backend}
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", "--iterations", str(iterations)],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.iterations)
+        return 0
+
+    # Each backend runs in its own process: the response class is bound when routes are built
+    results = {backend: measure_backend(backend, args.iterations) for backend in BACKENDS}
+    if results["orjson"]["response_class"] != "ORJSONResponse":
+        print("❌ orjson is not installed; nothing to compare")
+        return 1
+
+    print(f"📊 End-to-end request throughput, {args.iterations} requests per endpoint")
+    print("=" * 72)
+    print(f"{'Endpoint':<28}{'Size':>10}{'stdlib req/s':>14}{'orjson req/s':>14}{'Speedup':>9}")
+    for endpoint, stdlib in results["stdlib"]["endpoints"].items():
+        fast = results["orjson"]["endpoints"][endpoint]
+        print(f"{endpoint:<28}{stdlib['size']:>10}{stdlib['rps']:>14.0f}{fast['rps']:>14.0f}{fast['rps'] / stdlib['rps']:>8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -70,16 +70,41 @@ function App() {
   const fetchTools = async () => {
     try {
       const token = localStorage.getItem('token');
-      const response = await fetch(`${API_URL}/api/tools`, {
+      // The catalog is paginated: follow X-Next-Cursor until the last page
+      const toolsData = [];
+      let cursor = null;
+      do {
+        const url = cursor
+          ? `${API_URL}/api/tools?after=${encodeURIComponent(cursor)}`
+          : `${API_URL}/api/tools`;
+        const response = await fetch(url, {
+          headers: { Authorization: `Bearer ${token}` }
+        });
+        if (!response.ok) {
+          return;
+        }
+        toolsData.push(...(await response.json()));
+        cursor = response.headers.get('X-Next-Cursor');
+      } while (cursor);
+      setTools(toolsData);
+    } catch (error) {
+      console.error('Failed to fetch tools:', error);
+    }
+  };
+
+  const fetchTool = async (toolId) => {
+    try {
+      const token = localStorage.getItem('token');
+      const response = await fetch(`${API_URL}/api/tools/${toolId}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       if (response.ok) {
-        const toolsData = await response.json();
-        setTools(toolsData);
+        return await response.json();
       }
     } catch (error) {
-      console.error('Failed to fetch tools:', error);
+      console.error('Failed to fetch tool:', error);
     }
+    return null;
   };
 
   const handleAuth = async (e) => {
@@ -160,7 +185,12 @@ function App() {
     }
   };
 
-  const openEditDialog = (tool) => {
+  const openEditDialog = async (summary) => {
+    const tool = await fetchTool(summary.id);
+    if (!tool) {
+      setError('Impossible de charger l\'outil');
+      return;
+    }
     setEditingTool(tool);
     setToolFormData({
       title: tool.title,
@@ -172,7 +202,17 @@ function App() {
     setIsEditDialogOpen(true);
   };
 
-  const openToolFullscreen = (tool) => {
+  const openToolFullscreen = async (summary) => {
+    // Tools with a content hash are rendered straight from the cacheable render endpoint
+    if (summary.content_hash) {
+      setViewingTool(summary);
+      return;
+    }
+    const tool = await fetchTool(summary.id);
+    if (!tool) {
+      setError('Impossible de charger l\'outil');
+      return;
+    }
     setViewingTool(tool);
   };
 
@@ -211,7 +251,9 @@ function App() {
         </div>
         <div className="fullscreen-content">
           <iframe
-            srcDoc={viewingTool.html_content}
+            {...(viewingTool.content_hash
+              ? { src: `${API_URL}/api/tools/${viewingTool.id}/render?v=${viewingTool.content_hash}` }
+              : { srcDoc: viewingTool.html_content })}
             className="w-full h-full border-0"
             title={viewingTool.title}
             sandbox="allow-scripts allow-same-origin allow-forms"
@@ -1119,10 +1119,20 @@ def main():
             
         # Step 3: Verify the tool was created
         print("🔍 Verifying tool creation...")
-        tools_response = requests.get(f"{API_URL}/api/tools", headers=headers)
+        tools = []
+        params = {}
+        while True:
+            tools_response = requests.get(f"{API_URL}/api/tools", headers=headers, params=params)
+            if not tools_response.ok:
+                break
+            tools.extend(tools_response.json())
+            # The catalog is paginated: follow X-Next-Cursor until the last page
+            next_cursor = tools_response.headers.get("X-Next-Cursor")
+            if not next_cursor:
+                break
+            params = {"after": next_cursor}
         
         if tools_response.ok:
-            tools = tools_response.json()
             pixel_tools = [t for t in tools if "PIXEL" in t['title'].upper()]
             print(f"✅ Verification successful! Found {len(pixel_tools)} PIXEL-IA tool(s)")
             for tool in pixel_tools:
@@ -0,0 +1,110 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import pytest
+
+from server import PET_EVOLUTION_DEFAULT_STAGES, PET_EVOLUTION_MAX_STAGES, PetEvolution, validate_evolution_stages
+
+def test_default_stages_are_valid():
+    assert validate_evolution_stages(PET_EVOLUTION_DEFAULT_STAGES) is None
+
+@pytest.mark.parametrize("stages", [
+    [],
+    None,
+    "baby",
+    ["baby"],
+    [{"stage": "baby", "level": 1}],
+    [{"stage": "baby", "level": 0, "min_modules": 0}],
+    [{"stage": "baby", "level": "1", "min_modules": 0}],
+    [{"stage": "", "level": 1, "min_modules": 0}],
+    [{"stage": "baby", "level": 1, "min_modules": 2}],
+    [{"stage": "$master", "level": 1, "min_modules": 0}],
+    [{"stage": "baby", "level": 1, "min_modules": 0}, {"stage": "baby", "level": 2, "min_modules": 1}],
+    [{"stage": "baby", "level": 1, "min_modules": 0}, {"stage": "teen", "level": 2, "min_modules": 0}],
+    [{"stage": f"s{i}", "level": 1, "min_modules": i} for i in range(PET_EVOLUTION_MAX_STAGES + 1)],
+])
+def test_invalid_stages_are_rejected(stages):
+    assert validate_evolution_stages(stages) is not None
+
+def _evaluate(expression, doc):
+    """Evaluate the aggregation operators the compiled rules use"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return doc.get(expression[1:])
+    if not isinstance(expression, dict):
+        return expression
+    (operator, args), = expression.items()
+    if operator == "$literal":
+        return args
+    if operator == "$switch":
+        for branch in args["branches"]:
+            if _evaluate(branch["case"], doc):
+                return _evaluate(branch["then"], doc)
+        return _evaluate(args["default"], doc)
+    values = [_evaluate(arg, doc) for arg in args]
+    if operator == "$gte":
+        return values[0] >= values[1]
+    if operator == "$gt":
+        return values[0] > values[1]
+    if operator == "$cond":
+        return values[1] if values[0] else values[2]
+    if operator == "$arrayElemAt":
+        return values[0][values[1]]
+    if operator == "$indexOfArray":
+        return values[0].index(values[1]) if values[1] in values[0] else -1
+    raise AssertionError(f"Unexpected operator {operator}")
+
+def _evolve(stages, pet):
+    """Run a pet document through the compiled update pipeline stages"""
+    doc = dict(pet)
+    for stage in PetEvolution._compile(stages):
+        (operator, spec), = stage.items()
+        if operator == "$set":
+            doc = {**doc, **{field: _evaluate(value, doc) for field, value in spec.items()}}
+        else:
+            doc.pop(spec)
+    return doc
+
+@pytest.mark.parametrize("stage, level, modules_completed, expected", [
+    ("baby", 1, 0, ("baby", 1)),
+    ("baby", 1, 1, ("teen", 2)),
+    ("baby", 1, 2, ("teen", 2)),
+    # Several thresholds crossed at once: straight to the highest stage
+    ("baby", 1, 3, ("adult", 4)),
+    ("baby", 1, 6, ("master", 6)),
+    ("teen", 2, 40, ("master", 6)),
+    # No demotion, and the level is left alone when the stage stays
+    ("master", 9, 1, ("master", 9)),
+    ("adult", 5, 4, ("adult", 5)),
+    # Unknown stages evolve to whatever the count reaches
+    ("egg", 0, 0, ("baby", 1)),
+])
+def test_compiled_rules_evolve_pets(stage, level, modules_completed, expected):
+    pet = {"stage": stage, "level": level, "modules_completed": modules_completed}
+    evolved = _evolve(PET_EVOLUTION_DEFAULT_STAGES, pet)
+    assert (evolved["stage"], evolved["level"]) == expected
+    assert "_evolution_rank" not in evolved
+
+def test_compiled_rules_handle_large_thresholds():
+    stages = [
+        {"stage": "baby", "level": 1, "min_modules": 0},
+        {"stage": "legend", "level": 99, "min_modules": 10 ** 9},
+    ]
+    assert _evolve(stages, {"stage": "baby", "level": 1, "modules_completed": 10 ** 9 - 1})["stage"] == "baby"
+    assert _evolve(stages, {"stage": "baby", "level": 1, "modules_completed": 10 ** 9})["stage"] == "legend"
+
+def test_stage_names_are_literals():
+    stages = [
+        {"stage": "baby", "level": 1, "min_modules": 0},
+        {"stage": "master.v2", "level": 2, "min_modules": 1},
+    ]
+    evolved = _evolve(stages, {"stage": "baby", "level": 1, "modules_completed": 1, "master.v2": "wrong"})
+    assert evolved["stage"] == "master.v2"
+
+def test_compiled_switch_checks_highest_threshold_first():
+    switch = PetEvolution._compile(PET_EVOLUTION_DEFAULT_STAGES)[0]["$set"]["_evolution_rank"]["$switch"]
+    thresholds = [branch["case"]["$gte"][1] for branch in switch["branches"]]
+    ranks = [branch["then"] for branch in switch["branches"]]
+    assert thresholds == [6, 3, 1, 0]
+    assert ranks == [3, 2, 1, 0]
@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import pytest
+
+from server import apply_text_delta, make_text_delta
+
+@pytest.mark.parametrize("previous, current", [
+    ("", ""),
+    ("", "<p>a</p>\n<p>b</p>"),
+    ("<p>a</p>\n<p>b</p>\n", ""),
+    ("<p>a</p>\n<p>b</p>\n", "<p>a</p>\n<p>b</p>\n"),
+    ("a\nb\nc\n", "a\nB\nc\n"),
+    ("a\nb\nc", "x\na\nc\ny"),
+    ("no trailing newline", "no trailing newline\n"),
+    ("a\r\nb\r\nc\r\n", "a\r\nB\r\nc\r\n"),
+    ("a\rb\rc", "a\rc\rd"),
+    ("a\x0bb\x0cc\x1cd", "a\x0bB\x0cc\x1cd e"),
+    ("a\nb\r\nc\rd", "a\r\nb\nc\rd\r"),
+])
+def test_delta_round_trip(previous, current):
+    assert apply_text_delta(previous, make_text_delta(previous, current)) == current
+
+def test_unchanged_text_has_empty_delta():
+    assert make_text_delta("a\nb\n", "a\nb\n") == []
+
+def test_delta_only_carries_changed_lines():
+    previous = "".join(f"line {i}\n" for i in range(100))
+    current = previous.replace("line 50\n", "line fifty\n")
+    assert make_text_delta(previous, current) == [[50, 51, "line fifty\n"]]
+
+def test_delta_splits_on_vertical_tab_like_splitlines():
+    # str.splitlines treats \x0b as a line break: the indices must follow it
+    delta = make_text_delta("a\x0bb\x0bc", "a\x0bX\x0bc")
+    assert delta == [[1, 2, "X\x0b"]]
+    assert apply_text_delta("a\x0bb\x0bc", delta) == "a\x0bX\x0bc"
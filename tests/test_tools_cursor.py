@@ -0,0 +1,46 @@
+import base64
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import pytest
+from fastapi import HTTPException
+
+from server import decode_tools_cursor, encode_tools_cursor
+
+def _cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 8, 30, 12, 345000)
+    cursor = encode_tools_cursor({"display_rank": 3, "created_at": created_at, "id": "tool-1"})
+    assert decode_tools_cursor(cursor) == {"$or": [
+        {"display_rank": {"$gt": 3}},
+        {"display_rank": 3, "created_at": {"$gt": created_at}},
+        {"display_rank": 3, "created_at": created_at, "id": {"$gt": "tool-1"}},
+    ]}
+
+def test_cursor_stores_aware_datetimes_as_naive_utc():
+    created_at = datetime(2024, 5, 17, 8, 30, 12, 345678, tzinfo=timezone.utc)
+    cursor = encode_tools_cursor({"display_rank": 1, "created_at": created_at, "id": "tool-1"})
+    decoded = decode_tools_cursor(cursor)["$or"][1]["created_at"]["$gt"]
+    assert decoded == datetime(2024, 5, 17, 8, 30, 12, 345000)
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    _cursor([1, "2024-05-17T08:30:12"]),
+    _cursor([1, "yesterday", "tool-1"]),
+    _cursor({"$ne": None}),
+    _cursor([{"$ne": None}, "2024-05-17T08:30:12", "tool-1"]),
+    _cursor([1, "2024-05-17T08:30:12", {"$gt": ""}]),
+    _cursor([True, "2024-05-17T08:30:12", "tool-1"]),
+    _cursor([1.5, "2024-05-17T08:30:12", "tool-1"]),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_tools_cursor(cursor)
+    assert error.value.status_code == 400
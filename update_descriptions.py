@@ -105,44 +105,23 @@ def update_descriptions():
     
     for tool_update in tools_updates:
         try:
-            # Get current tool data first
-            get_url = f"{backend_url}/api/tools"
-            get_response = requests.get(get_url, headers=headers)
-            
-            if get_response.status_code != 200:
-                print(f"❌ Failed to get tools: {get_response.text}")
-                continue
-                
-            tools = get_response.json()
-            current_tool = None
-            
-            for tool in tools:
-                if tool["id"] == tool_update["id"]:
-                    current_tool = tool
-                    break
-            
-            if not current_tool:
-                print(f"❌ Tool {tool_update['title']} not found")
-                continue
-            
-            # Update with new description
+            # Send only the changed fields; html_content stays on the server
             tool_data = {
-                "title": current_tool["title"],
-                "description": tool_update["new_description"], 
-                "category": tool_update["category"],
-                "html_content": current_tool["html_content"],
-                "preview_image": current_tool.get("preview_image", "")
+                "description": tool_update["new_description"],
+                "category": tool_update["category"]
             }
             
             # Update tool
             update_url = f"{backend_url}/api/tools/{tool_update['id']}"
-            update_response = requests.put(update_url, json=tool_data, headers=headers)
+            update_response = requests.patch(update_url, json=tool_data, headers=headers)
             
             if update_response.status_code == 200:
                 print(f"✅ {tool_update['title']}")
                 print(f"   New: {tool_update['new_description']}")
                 print(f"   Reason: {tool_update['reason']}")
                 success_count += 1
+            elif update_response.status_code == 404:
+                print(f"❌ Tool {tool_update['title']} not found")
             else:
                 print(f"❌ Failed to update {tool_update['title']}: {update_response.text}")
                 